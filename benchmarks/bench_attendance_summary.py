@@ -0,0 +1,95 @@
+"""Benchmark for the /attendance/student-summary engine.
+
+Seeds a throwaway SQLite database with one cohort and a growing number of
+attendance rows, then times build_attendance_summary for each size. The
+rollup is rebuilt (untimed) after each batch, so the summary cost should stay
+flat as raw attendance rows grow.
+
+    python benchmarks/bench_attendance_summary.py [students] [subjects]
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Never point the benchmark at the real database from .env
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+import main  # noqa: E402
+
+BRANCH = "CSE"
+SEMESTER = 5
+
+
+def seed(db, students, subjects):
+    db.execute(insert(main.Student), [
+        {
+            "studentId": i,
+            "name": f"Student {i}",
+            "email": f"student{i}@example.com",
+            "registration_number": f"REG{i:05d}",
+            "semester": SEMESTER,
+            "branch": BRANCH,
+            "specialization": "AI",
+        }
+        for i in range(1, students + 1)
+    ])
+    db.execute(insert(main.Syllabus), [
+        {
+            "subject": f"Subject {j}",
+            "code": f"SUB{j}",
+            "semester": SEMESTER,
+            "branch": BRANCH,
+            "credits": 3,
+            "upload_date": "2024-01-01",
+        }
+        for j in range(subjects)
+    ])
+    db.commit()
+
+
+def add_sessions(db, students, subjects, first_day, days):
+    rows = [
+        {
+            "studentId": i,
+            "subject_code": f"Subject {j}",
+            "date": f"2024-{1 + d // 28:02d}-{1 + d % 28:02d}",
+            "attendance": "P" if (i + d) % 4 else "A",
+            "class_type": "lecture",
+        }
+        for d in range(first_day, first_day + days)
+        for j in range(subjects)
+        for i in range(1, students + 1)
+    ]
+    db.execute(insert(main.Attendance), rows)
+    db.commit()
+    return len(rows)
+
+
+def run(students=600, subjects=6, steps=(5, 5, 10, 20)):
+    main.Base.metadata.create_all(bind=main.engine)
+    db = main.SessionLocal()
+    try:
+        seed(db, students, subjects)
+        total_rows = 0
+        day = 0
+        print(f"{'attendance rows':>16} {'seconds':>10} {'us/row':>10}")
+        for days in steps:
+            total_rows += add_sessions(db, students, subjects, day, days)
+            day += days
+            main.rebuild_attendance_rollup(db)
+            start = time.perf_counter()
+            summary = main.build_attendance_summary(db, BRANCH, SEMESTER)
+            elapsed = time.perf_counter() - start
+            assert len(summary) == students
+            print(f"{total_rows:>16} {elapsed:>10.3f} {elapsed / total_rows * 1e6:>10.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
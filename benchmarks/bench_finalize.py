@@ -0,0 +1,72 @@
+"""Benchmark for /attendance/finalize.
+
+For each class size, finalizes one fresh class (all inserts) and then
+re-finalizes it (all updates), reporting latency and SQL statements issued.
+Both should stay flat as the class grows.
+
+    python benchmarks/bench_finalize.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Never point the benchmark at the real database from .env
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert  # noqa: E402
+
+import main  # noqa: E402
+
+CLASS_SIZES = (30, 60, 120, 240, 480)
+
+
+def seed(db, students):
+    db.execute(insert(main.Student), [
+        {
+            "studentId": i,
+            "name": f"Student {i}",
+            "email": f"student{i}@example.com",
+            "registration_number": f"REG{i:05d}",
+            "semester": 5,
+            "branch": "CSE",
+        }
+        for i in range(1, students + 1)
+    ])
+    db.commit()
+
+
+def finalize(db, subject, size, status):
+    attendance_data = [{"studentId": i, "status": status} for i in range(1, size + 1)]
+    start = time.perf_counter()
+    main.finalize_attendance_rows(db, subject, "2024-03-01", "lab", attendance_data)
+    db.commit()
+    return time.perf_counter() - start
+
+
+def run():
+    main.Base.metadata.create_all(bind=main.engine)
+    statements = [0]
+    event.listen(main.engine, "before_cursor_execute", lambda *args: statements.__setitem__(0, statements[0] + 1))
+
+    db = main.SessionLocal()
+    try:
+        seed(db, max(CLASS_SIZES))
+        print(f"{'class size':>10} {'insert ms':>10} {'queries':>8} {'update ms':>10} {'queries':>8}")
+        for size in CLASS_SIZES:
+            subject = f"Lab {size}"
+            statements[0] = 0
+            insert_time = finalize(db, subject, size, "P")
+            insert_queries = statements[0]
+            statements[0] = 0
+            update_time = finalize(db, subject, size, "A")
+            update_queries = statements[0]
+            print(f"{size:>10} {insert_time * 1000:>10.2f} {insert_queries:>8} "
+                  f"{update_time * 1000:>10.2f} {update_queries:>8}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
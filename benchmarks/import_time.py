@@ -0,0 +1,71 @@
+"""Import-time budget for `main`, i.e. the per-worker boot cost.
+
+Imports main in fresh interpreters and fails (exit status 1) if the median
+import time exceeds the budget, if a heavy optional module (pandas, openpyxl,
+mysql.connector) is imported eagerly, or if importing touches the database.
+
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 1200]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("pandas", "openpyxl", "mysql.connector")
+
+PROBE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def import_once(database_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}", DB_INIT_ON_STARTUP="0")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(runs, budget_ms):
+    database_path = os.path.join(tempfile.mkdtemp(), "import_time.db")
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        probe = import_once(database_path)
+        samples.append(probe["seconds"] * 1000)
+        loaded.update(probe["loaded"])
+
+    median = statistics.median(samples)
+    print(f"import main: median {median:.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms "
+          f"over {runs} runs (budget {budget_ms:.0f} ms)")
+
+    failures = []
+    if median > budget_ms:
+        failures.append(f"median import time {median:.0f} ms is over the {budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"imported eagerly: {', '.join(sorted(loaded))}")
+    if os.path.exists(database_path):
+        failures.append("importing main connected to the database")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1200)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.runs, args.budget_ms) else 1)
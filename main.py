@@ -3,24 +3,99 @@ from dotenv import load_dotenv
 #uvicorn main:app --reload
 from fastapi import FastAPI, HTTPException, Depends, Query, Path, Response, Body, UploadFile, File, Form, WebSocket, WebSocketDisconnect, Request
 from pydantic import BaseModel
-from sqlalchemy import create_engine, Column, Integer, String, Enum, func, ForeignKey, Date, Boolean, UniqueConstraint, or_
+from sqlalchemy import create_engine, Column, Integer, String, Enum, func, ForeignKey, Date, Boolean, UniqueConstraint, Index, or_, and_, case, select, insert, update, delete, inspect, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.sql import table as sql_table, column as sql_column, literal_column
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import enum
+from contextlib import contextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
 from typing import List, Optional
 from datetime import datetime, timedelta
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-import mysql.connector
-from mysql.connector import Error
 import json
-import pandas as pd
-import io
+import re
+import uuid
+import zlib
+from urllib.parse import urlencode
+from collections import OrderedDict
+import logging
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import contextvars
+import threading
+import time
 
 load_dotenv()  # This loads the variables from .env
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+# Per-logger overrides, e.g. LOG_LEVELS="campus.qr=DEBUG,campus.ws=INFO"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra={...}`` fields"""
+
+    RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in self.RESERVED})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def configure_logging():
+    """Send the campus.* loggers through a queue to a background writer thread.
+
+    Records are formatted by the QueueHandler (only once they pass the level
+    check), so request handlers never block on stderr.
+    """
+    campus_log = logging.getLogger("campus")
+    if campus_log.handlers:
+        return
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    if LOG_FORMAT == "text":
+        queue_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        queue_handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+
+    campus_log.setLevel(LOG_LEVEL)
+    campus_log.addHandler(queue_handler)
+    campus_log.propagate = False
+    for override in LOG_LEVELS.split(","):
+        name, _, level = override.partition("=")
+        if name.strip() and level.strip():
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    listener.start()
+    atexit.register(listener.stop)
+
+configure_logging()
+api_log = logging.getLogger("campus.api")
+attendance_log = logging.getLogger("campus.attendance")
+qr_log = logging.getLogger("campus.qr")
+ws_log = logging.getLogger("campus.ws")
+notifications_log = logging.getLogger("campus.notifications")
+reports_log = logging.getLogger("campus.reports")
+
 app = FastAPI()
 
 # Configure CORS
@@ -30,6 +105,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
 # Mount static files directory
@@ -39,13 +115,110 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 DATABASE_URL = os.getenv("DATABASE_URL")  # Get the URL from environment variable
 
-engine = create_engine(DATABASE_URL)
+# Connection pool, shared by the sync and async engines (each gets its own pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle before MySQL's wait_timeout closes idle connections server-side
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes", "on")
+
+def get_pool_options(url):
+    """create_engine() pool arguments from the DB_POOL_* settings"""
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    # In-memory SQLite uses a single-connection pool that takes no size
+    # limits; file databases get a QueuePool like any other backend
+    url = make_url(url)
+    in_memory = url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+    if not in_memory:
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+class PoolStats:
+    """Checkout wait time and timeouts for an engine's pool, plus its live gauges.
+
+    Checkouts are timed inside the pool (including any pre-ping), so they are
+    only counted when a session actually needs a connection.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.instrument(engine.pool)
+        # dispose() replaces the engine's pool
+        event.listen(engine, "engine_disposed", lambda disposed: self.instrument(disposed.pool))
+
+    def instrument(self, pool):
+        connect = pool.connect
+
+        def timed_connect():
+            with self.measure_checkout():
+                return connect()
+        pool.connect = timed_connect
+
+    @contextmanager
+    def measure_checkout(self):
+        start = time.perf_counter()
+        try:
+            yield
+        except SQLAlchemyTimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self.lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self):
+        pool = self.engine.pool
+
+        def gauge(name):
+            # NullPool/StaticPool (SQLite) don't track these
+            method = getattr(pool, name, None)
+            return method() if callable(method) else None
+
+        with self.lock:
+            return {
+                "pool": type(pool).__name__,
+                "size": gauge("size"),
+                "checkedOut": gauge("checkedout"),
+                "checkedIn": gauge("checkedin"),
+                "overflow": gauge("overflow"),
+                "checkouts": self.checkouts,
+                "waitAvgMs": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "waitMaxMs": round(self.wait_max * 1000, 3),
+                "waitTotalSeconds": round(self.wait_total, 3),
+                "timeouts": self.timeouts,
+            }
+
+engine = create_engine(DATABASE_URL, **get_pool_options(DATABASE_URL))
+pool_stats = PoolStats(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-# After all model definitions and before any routes
-# Create all tables
-Base.metadata.create_all(bind=engine)
+def get_async_database_url(url: str):
+    """ASYNC_DATABASE_URL if set, otherwise DATABASE_URL with its asyncio driver"""
+    async_url = os.getenv("ASYNC_DATABASE_URL")
+    if async_url:
+        return async_url
+    url = make_url(url)
+    async_drivers = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+    return url.set(drivername=async_drivers.get(url.get_backend_name(), url.drivername))
+
+# Used by the async endpoints so queries don't block the event loop (and /ws)
+ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_pool_options(ASYNC_DATABASE_URL))
+async_pool_stats = PoolStats(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+Base = declarative_base()
+# Tables are created by init_db() (`python main.py migrate`), not on import
 
 class RoleEnum(str, enum.Enum):
     student = "student"
@@ -91,6 +264,13 @@ class Student(Base):
     starting_year = Column(Integer)
     passout_year = Column(Integer)
 
+    __table_args__ = (
+        # Prefix search and roster filters on /students/search
+        Index('ix_student_name', 'name'),
+        Index('ix_student_registration_number', 'registration_number'),
+        Index('ix_student_branch_semester', 'branch', 'semester'),
+    )
+
 class StudentCreate(BaseModel):
     name: str
     email: str
@@ -183,6 +363,9 @@ class Syllabus(Base):
     description = Column(String(1000), nullable=True)
     specialization = Column(String(50), nullable=True)
 
+    # For /search on MySQL; SQLite uses the search_index FTS5 table
+    __table_args__ = (Index('ft_syllabus_text', 'subject', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),)
+
 class SyllabusBase(BaseModel):
     subject: str
     code: str
@@ -231,6 +414,8 @@ class Assignment(Base):
     faculty_id = Column(Integer, ForeignKey("faculty.id"), nullable=False)
     faculty = relationship("Faculty", backref="assignments")
 
+    __table_args__ = (Index('ft_assignments_text', 'title', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),)
+
 class AssignmentCreate(BaseModel):
     title: str
     subject: str
@@ -277,6 +462,8 @@ class Notification(Base):
     sent_at = Column(String(20), nullable=True)
     recipients_count = Column(Integer, default=0)
 
+    __table_args__ = (Index('ft_notifications_text', 'title', 'message', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),)
+
 class ReadNotification(Base):
     __tablename__ = "read_notifications"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -291,10 +478,29 @@ class Attendance(Base):
     __tablename__ = "attendance"
     attendance_id = Column(Integer, primary_key=True)
     studentId = Column(Integer, ForeignKey("student.studentId"))
-    subject_code = Column(String)
-    date = Column(String)  # Keep as string since that's how it's in the DB
-    attendance = Column(String)  # 'P' or 'A'
-    class_type = Column(String)  # Add class type field
+    subject_code = Column(String(255))
+    date = Column(String(20))  # Keep as string since that's how it's in the DB
+    attendance = Column(String(10))  # 'P' or 'A'
+    class_type = Column(String(50))  # Add class type field
+
+    # One row per student per class session; see migrate_attendance_unique_index.
+    # The second index serves the per-class lookups that don't know the student.
+    __table_args__ = (
+        Index('uix_attendance_session', 'studentId', 'subject_code', 'date', 'class_type', unique=True),
+        Index('ix_attendance_class', 'subject_code', 'date', 'class_type'),
+    )
+
+class AttendanceSummary(Base):
+    # Per-student, per-subject rollup of Attendance kept in sync on write
+    __tablename__ = "attendance_summary"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    studentId = Column(Integer, ForeignKey("student.studentId"), nullable=False)
+    subject_code = Column(String(255), nullable=False)
+    present_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    last_date = Column(String(20), nullable=True)
+
+    __table_args__ = (UniqueConstraint('studentId', 'subject_code', name='uix_attendance_summary'),)
 
 class AttendanceCreate(BaseModel):
     student_id: int
@@ -303,6 +509,16 @@ class AttendanceCreate(BaseModel):
     status: str
     class_type: str  # Add class type to the model
 
+class AttendanceBulkRecord(BaseModel):
+    student_id: int
+    status: str
+
+class AttendanceBulkCreate(BaseModel):
+    subject: str
+    date: str
+    class_type: str  # Required: NULLs are not covered by uix_attendance_session
+    records: List[AttendanceBulkRecord]
+
 class SubmissionStatusUpdate(BaseModel):
     status: str
 
@@ -332,6 +548,325 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    # Checked out lazily: most QR scans are served from the in-memory buffer
+    # and shouldn't hold a connection
+    async with AsyncSessionLocal() as db:
+        yield db
+
+class RequestStats:
+    """SQL statements run while serving the current request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+# Set per request by the metrics middleware; the object is shared with the
+# threadpool and run_sync contexts the handler's queries run in
+current_request_stats = contextvars.ContextVar("current_request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - context._query_started
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
+class RequestMetrics:
+    """Per-route latency and SQL usage, rendered in the Prometheus text format"""
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}  # (method, route) -> counters
+        self.responses = {}  # (method, route, status) -> count
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self.lock:
+            counters = self.routes.get((method, route))
+            if counters is None:
+                counters = self.routes[(method, route)] = {
+                    "latency": [0] * len(self.LATENCY_BUCKETS),
+                    "queries": [0] * len(self.QUERY_BUCKETS),
+                    "count": 0,
+                    "seconds": 0.0,
+                    "query_total": 0,
+                    "db_seconds": 0.0,
+                }
+            for i, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    counters["latency"][i] += 1
+            for i, bound in enumerate(self.QUERY_BUCKETS):
+                if stats.queries <= bound:
+                    counters["queries"][i] += 1
+            counters["count"] += 1
+            counters["seconds"] += seconds
+            counters["query_total"] += stats.queries
+            counters["db_seconds"] += stats.db_seconds
+            key = (method, route, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self):
+        def histogram(name, labels, buckets, counts, total, count):
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {total}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+
+        lines = []
+        with self.lock:
+            routes = sorted(self.routes.items())
+            responses = sorted(self.responses.items())
+
+        lines.append("# HELP http_requests_total Requests served, by route and status.")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), count in responses:
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines.append("# HELP http_request_duration_seconds Request latency, by route.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), counters in routes:
+            histogram("http_request_duration_seconds", f'method="{method}",route="{route}"',
+                      self.LATENCY_BUCKETS, counters["latency"], round(counters["seconds"], 6), counters["count"])
+
+        lines.append("# HELP http_request_db_queries SQL statements per request, by route.")
+        lines.append("# TYPE http_request_db_queries histogram")
+        for (method, route), counters in routes:
+            histogram("http_request_db_queries", f'method="{method}",route="{route}"',
+                      self.QUERY_BUCKETS, counters["queries"], counters["query_total"], counters["count"])
+
+        lines.append("# HELP http_request_db_seconds_total Time spent in SQL statements, by route.")
+        lines.append("# TYPE http_request_db_seconds_total counter")
+        for (method, route), counters in routes:
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{route}"}} {round(counters["db_seconds"], 6)}')
+        return lines
+
+request_metrics = RequestMetrics()
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    start = time.perf_counter()
+
+    def observe(status: int):
+        # Label by route template (/students/{student_id}), not the raw path
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        request_metrics.observe(request.method, route_path, status, time.perf_counter() - start, stats)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe(500)
+        raise
+    finally:
+        current_request_stats.reset(token)
+
+    # Observed once the body has been sent: streamed bodies (GET /students?stream=true)
+    # still run queries, which count towards ``stats`` through the app's context
+    body = response.body_iterator
+
+    async def observed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            observe(response.status_code)
+
+    response.body_iterator = observed_body()
+    return response
+
+def apply_attendance_changes(db: Session, changes):
+    """Refresh the AttendanceSummary rows touched by Attendance writes.
+
+    ``changes`` is an iterable of (student_id, subject, date, old_status, new_status)
+    tuples; old_status is None for inserted rows and new_status is None for
+    deleted ones. The affected (student, subject) rollups are recomputed from
+    Attendance with one grouped INSERT ... SELECT upsert rather than adjusted by
+    deltas, so concurrent writers to the same class can't double-count or race
+    on the unique key. The caller commits.
+    """
+    changes = list(changes)
+    student_ids = {change[0] for change in changes if change[0] is not None}
+    subjects = {change[1] for change in changes if change[1] is not None}
+    if not student_ids or not subjects:
+        return
+
+    # Recomputing the cross product of the two sets is a superset of the
+    # affected keys, and exact for the others
+    grouped = select(
+        Attendance.studentId,
+        Attendance.subject_code,
+        func.coalesce(func.sum(case((Attendance.attendance == 'P', 1), else_=0)), 0),
+        func.count(Attendance.attendance_id),
+        func.max(Attendance.date)
+    ).where(
+        Attendance.studentId.in_(student_ids),
+        Attendance.subject_code.in_(subjects)
+    ).group_by(Attendance.studentId, Attendance.subject_code)
+    columns = ["studentId", "subject_code", "present_count", "total_count", "last_date"]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(AttendanceSummary.__table__).from_select(columns, grouped)
+        stmt = stmt.on_duplicate_key_update(
+            present_count=stmt.inserted.present_count,
+            total_count=stmt.inserted.total_count,
+            last_date=stmt.inserted.last_date
+        )
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(AttendanceSummary.__table__).from_select(columns, grouped)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['studentId', 'subject_code'],
+            set_={
+                "present_count": stmt.excluded.present_count,
+                "total_count": stmt.excluded.total_count,
+                "last_date": stmt.excluded.last_date
+            }
+        )
+    else:
+        db.query(AttendanceSummary).filter(
+            AttendanceSummary.studentId.in_(student_ids),
+            AttendanceSummary.subject_code.in_(subjects)
+        ).delete(synchronize_session=False)
+        stmt = insert(AttendanceSummary.__table__).from_select(columns, grouped)
+    db.execute(stmt)
+
+    if any(change[4] is None for change in changes):
+        # Rollups left without any attendance rows
+        db.query(AttendanceSummary).filter(
+            AttendanceSummary.studentId.in_(student_ids),
+            AttendanceSummary.subject_code.in_(subjects),
+            ~select(Attendance.attendance_id).where(
+                Attendance.studentId == AttendanceSummary.studentId,
+                Attendance.subject_code == AttendanceSummary.subject_code
+            ).exists()
+        ).delete(synchronize_session=False)
+
+def rebuild_attendance_rollup(db: Session):
+    """Recompute AttendanceSummary from the raw Attendance table"""
+    AttendanceSummary.__table__.create(bind=db.get_bind(), checkfirst=True)
+    rows = db.query(
+        Attendance.studentId,
+        Attendance.subject_code,
+        func.sum(case((Attendance.attendance == 'P', 1), else_=0)),
+        func.count(Attendance.attendance_id),
+        func.max(Attendance.date)
+    ).filter(
+        Attendance.studentId.isnot(None),
+        Attendance.subject_code.isnot(None)
+    ).group_by(Attendance.studentId, Attendance.subject_code).all()
+
+    db.query(AttendanceSummary).delete(synchronize_session=False)
+    if rows:
+        db.execute(AttendanceSummary.__table__.insert(), [
+            {
+                "studentId": student_id,
+                "subject_code": subject,
+                "present_count": int(present_count or 0),
+                "total_count": int(total_count),
+                "last_date": str(last_date) if last_date else None
+            }
+            for student_id, subject, present_count, total_count, last_date in rows
+        ])
+    db.commit()
+    return len(rows)
+
+def upsert_attendance_rows(db: Session, rows: list):
+    """Insert attendance rows, updating the status of any row that already
+    exists for the same (studentId, subject_code, date, class_type)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(Attendance.__table__)
+        stmt = stmt.on_duplicate_key_update(attendance=stmt.inserted.attendance)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(Attendance.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['studentId', 'subject_code', 'date', 'class_type'],
+            set_={"attendance": stmt.excluded.attendance}
+        )
+    else:
+        stmt = insert(Attendance.__table__)
+    db.execute(stmt, rows)
+
+def write_attendance_statuses(db: Session, subject: str, date: str, class_type: str, statuses: dict):
+    """Write {student_id: status} for one class session with a fixed number of queries.
+
+    Existing rows are preloaded in one query; changes are written as one bulk
+    upsert for new rows and one bulk update for existing ones, and the affected
+    attendance rollups are recomputed. The caller commits.
+    """
+    existing_records = {
+        row.studentId: row
+        for row in db.query(Attendance.attendance_id, Attendance.studentId, Attendance.attendance).filter(
+            Attendance.subject_code == subject,
+            Attendance.date == date,
+            Attendance.class_type == class_type,
+            Attendance.studentId.in_(statuses)
+        ).all()
+    }
+
+    inserts = []
+    updates = []
+    rollup_changes = []
+    for student_id, status in statuses.items():
+        existing_record = existing_records.get(student_id)
+        if existing_record:
+            updates.append({"attendance_id": existing_record.attendance_id, "attendance": status})
+            rollup_changes.append((student_id, subject, date, existing_record.attendance, status))
+        else:
+            inserts.append({
+                "studentId": student_id,
+                "subject_code": subject,
+                "date": date,
+                "attendance": status,
+                "class_type": class_type
+            })
+            rollup_changes.append((student_id, subject, date, None, status))
+
+    if inserts:
+        # Upsert so a concurrent write for the same class can't create duplicates
+        upsert_attendance_rows(db, inserts)
+    if updates:
+        db.execute(update(Attendance), updates)
+    apply_attendance_changes(db, rollup_changes)
+
+def migrate_attendance_unique_index(db: Session):
+    """Remove duplicate attendance rows (keeping the newest) and create the Attendance indexes"""
+    newest_rows = select(func.max(Attendance.attendance_id).label('attendance_id')).group_by(
+        Attendance.studentId,
+        Attendance.subject_code,
+        Attendance.date,
+        Attendance.class_type
+    ).subquery()
+    # Select through a derived table so MySQL allows deleting from the same table
+    removed = db.query(Attendance).filter(
+        Attendance.attendance_id.notin_(select(newest_rows.c.attendance_id))
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    for index in Attendance.__table__.indexes:
+        index.create(bind=db.get_bind(), checkfirst=True)
+
+    # Duplicates were counted in the rollup as well
+    if removed:
+        rebuild_attendance_rollup(db)
+    return removed
+
 @app.post("/login", response_model=LoginResponse)
 def login(request: LoginRequest, db: Session = Depends(get_db)):
     try:
@@ -413,25 +948,69 @@ def create_student(student: StudentCreate, db: Session = Depends(get_db)):
         )
         db.add(new_user)
         db.commit()
+    student_reference_cache.invalidate()
     return {"success": True, "message": "Student added successfully."}
 
+STUDENT_LIST_FIELDS = (
+    "studentId", "name", "email", "registration_number", "semester",
+    "branch", "specialization", "starting_year", "passout_year",
+)
+STUDENT_STREAM_BATCH_SIZE = 500
+
+def stream_students(db: Session, query, columns, ndjson: bool):
+    """Yield students as NDJSON lines or JSON array chunks, one batch of rows at a time"""
+    # Streams on the request's session rather than a second pooled connection.
+    # Closed here too: depending on the FastAPI version get_db's cleanup runs
+    # before or after the body is sent, and a closed session reconnects on use.
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=STUDENT_STREAM_BATCH_SIZE))
+        first = True
+        for rows in result.partitions():
+            items = [json.dumps(dict(zip(columns, row))) for row in rows]
+            if ndjson:
+                yield "\n".join(items) + "\n"
+            else:
+                yield ("[" if first else ",") + ",".join(items)
+            first = False
+        if not ndjson:
+            yield "[]" if first else "]"
+    finally:
+        db.close()
+
 @app.get("/students")
-def get_students(db: Session = Depends(get_db)):
-    students = db.query(Student).all()
-    result = []
-    for s in students:
-        result.append({
-            "studentId": s.studentId,
-            "name": s.name,
-            "email": s.email,
-            "registration_number": s.registration_number,
-            "semester": s.semester,
-            "branch": s.branch,
-            "specialization": s.specialization,
-            "starting_year": s.starting_year,
-            "passout_year": s.passout_year,
-        })
-    return JSONResponse(content=result)
+def get_students(
+    limit: int | None = Query(None, ge=1, le=1000),
+    cursor: int | None = Query(None, description="studentId of the last row of the previous page"),
+    fields: str | None = Query(None, description="Comma-separated fields; studentId is always included"),
+    stream: bool = Query(False),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    # Without parameters this returns every student, as before. Pages are
+    # keyed on studentId; X-Next-Cursor is set when there may be more rows.
+    columns = list(STUDENT_LIST_FIELDS)
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in STUDENT_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        columns = ["studentId"] + [field for field in requested if field != "studentId"]
+
+    query = select(*[getattr(Student, column) for column in columns]).order_by(Student.studentId)
+    if cursor is not None:
+        query = query.where(Student.studentId > cursor)
+    if limit is not None:
+        query = query.limit(limit)
+
+    if stream or format == "ndjson":
+        media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+        return StreamingResponse(stream_students(db, query, columns, format == "ndjson"), media_type=media_type)
+
+    result = [dict(zip(columns, row)) for row in db.execute(query)]
+    headers = {}
+    if limit is not None and len(result) == limit:
+        headers["X-Next-Cursor"] = str(result[-1]["studentId"])
+    return JSONResponse(content=result, headers=headers)
 
 @app.get("/students/me")
 def get_current_student(email: str = Query(...), db: Session = Depends(get_db)):
@@ -446,7 +1025,78 @@ def get_current_student(email: str = Query(...), db: Session = Depends(get_db)):
         "semester": student.semester,
     }
 
-@app.get("/timetables")
+def multiple_workers():
+    """Whether several worker processes serve this app.
+
+    Read from WEB_CONCURRENCY, the worker count uvicorn and gunicorn default
+    to; set it rather than passing --workers / -w when running more than one.
+    """
+    try:
+        return int(os.getenv("WEB_CONCURRENCY", "1")) > 1
+    except ValueError:
+        return False
+
+# ETags for the listings every client polls on page load. Each worker counts
+# committed writes per table and hears about the other workers' writes over
+# the broadcast backend; the boot nonce stops ETags handed out before a
+# restart (when the counters were different) from ever matching again.
+# Between workers the unix broadcast backend is best effort (a datagram can
+# be dropped), so there ETags also carry a wall-clock epoch of
+# ETAG_MAX_STALE_SECONDS: a worker that missed a write serves a stale 304 for
+# at most that long. A single process with the memory backend has exact
+# counters and no epoch. With several workers and no shared backend the
+# counters can't be kept in step at all, and ETags are switched off.
+BOOT_NONCE = uuid.uuid4().hex[:12]
+TABLE_VERSION_TOPIC = "_internal:table-version"
+ETAG_MAX_STALE_SECONDS = float(os.getenv("ETAG_MAX_STALE_SECONDS", "60"))
+
+class TableVersions:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.enabled = True  # decided at startup
+
+    def get(self, table: str):
+        with self.lock:
+            return self.versions.get(table, 0)
+
+    def bump(self, tables):
+        with self.lock:
+            for table in tables:
+                self.versions[table] = self.versions.get(table, 0) + 1
+
+table_versions = TableVersions()
+
+def bump_table_versions(*tables: str):
+    """Invalidate ETags for ``tables`` on this and every other worker; call after commit"""
+    table_versions.bump(tables)
+    broadcast_threadsafe({"origin": BOOT_NONCE, "tables": list(tables)}, TABLE_VERSION_TOPIC)
+
+def conditional_get(*tables: str):
+    """Route dependency answering 304 Not Modified from the table versions alone.
+
+    Route-level dependencies run before the endpoint's own, so a client with a
+    current copy never opens a database session.
+    """
+    def check(request: Request, response: Response):
+        if not table_versions.enabled:
+            return
+        versions = ".".join(str(table_versions.get(table)) for table in tables)
+        if isinstance(broadcast_backend, UnixSocketBroadcastBackend):
+            versions = f"{int(time.time() // ETAG_MAX_STALE_SECONDS)}-{versions}"
+        query = urlencode(sorted(request.query_params.multi_items()))
+        digest = zlib.crc32(f"{request.url.path}?{query}".encode())
+        etag = f'W/"{BOOT_NONCE}-{versions}-{digest:08x}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Weak comparison, as If-None-Match requires
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in candidates or etag.removeprefix("W/") in candidates:
+                raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    return check
+
+@app.get("/timetables", dependencies=[Depends(conditional_get("timetable"))])
 def get_timetables(branch: str = Query(...), semester: int = Query(...), db: Session = Depends(get_db)):
     timetables = db.query(Timetable).filter(
         func.lower(Timetable.branch) == branch.lower().strip(),
@@ -472,6 +1122,7 @@ def add_timetable(entry: TimetableCreate, db: Session = Depends(get_db)):
     new_entry = Timetable(**entry.dict())
     db.add(new_entry)
     db.commit()
+    bump_table_versions("timetable")
     db.refresh(new_entry)
     return {"success": True, "id": new_entry.id}
 
@@ -501,6 +1152,7 @@ def add_timetables_bulk(entries: List[TimetableCreate], db: Session = Depends(ge
     if valid_entries:
         db.add_all(valid_entries)
         db.commit()
+        bump_table_versions("timetable")
         inserted = len(valid_entries)
 
     return {
@@ -518,6 +1170,7 @@ def update_timetable(id: int, entry: TimetableCreate, db: Session = Depends(get_
     for key, value in entry.dict().items():
         setattr(timetable, key, value)
     db.commit()
+    bump_table_versions("timetable")
     return {"success": True}
 
 @app.delete("/timetables/{id}")
@@ -527,6 +1180,7 @@ def delete_timetable(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Timetable entry not found")
     db.delete(timetable)
     db.commit()
+    bump_table_versions("timetable")
     return {"success": True}
 
 @app.put("/students/{student_id}")
@@ -544,10 +1198,11 @@ def update_student(student_id: int, student_data: dict, db: Session = Depends(ge
                 setattr(student, field, student_data[field])
 
         db.commit()
+        student_reference_cache.invalidate()
         return {"message": "Student updated successfully"}
     except Exception as e:
         db.rollback()
-        print(f"Error updating student: {str(e)}")
+        api_log.exception("Error updating student")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/students/{student_id}")
@@ -557,9 +1212,89 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Student not found")
     db.delete(db_student)
     db.commit()
+    student_reference_cache.invalidate()
+    broadcast_threadsafe({"forget_students": [student_id]}, QR_BUFFER_TOPIC)
     return {"success": True, "message": "Student deleted successfully."}
 
-@app.get("/syllabus", response_model=list[SyllabusOut])
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "1024"))
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Process-local: each worker has its own copy, so writes on another worker
+    are only picked up once the entry expires.
+    """
+
+    def __init__(self, name: str, ttl: float = REFERENCE_CACHE_TTL_SECONDS, maxsize: int = REFERENCE_CACHE_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss.
+
+        The loader runs outside the lock; values should be treated as read-only.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = loader()
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, key=None):
+        """Drop ``key``, or every entry when no key is given"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+# Reference data behind the dropdowns; cleared by the student, syllabus and
+# faculty write endpoints respectively
+student_reference_cache = TTLCache("student_reference")
+syllabus_reference_cache = TTLCache("syllabus_reference")
+faculty_name_cache = TTLCache("faculty_names", maxsize=1)
+caches = (student_reference_cache, syllabus_reference_cache, faculty_name_cache)
+
+def get_faculty_names(db: Session, required_ids=()):
+    """Return the cached faculty id -> name map, reloading it if any required id is missing"""
+    def load():
+        return dict(db.query(Faculty.id, Faculty.name).all())
+
+    names = faculty_name_cache.get_or_load("names", load)
+    if any(i not in names for i in required_ids):
+        faculty_name_cache.invalidate()
+        names = faculty_name_cache.get_or_load("names", load)
+    return names
+
+def invalidate_faculty_names():
+    """Called by the faculty write endpoints after commit"""
+    faculty_name_cache.invalidate()
+    # /syllabus/subjects-faculty lists faculty ids
+    syllabus_reference_cache.invalidate()
+    bump_table_versions("faculty")
+
+@app.get("/syllabus", response_model=list[SyllabusOut], dependencies=[Depends(conditional_get("syllabus", "faculty"))])
 def get_syllabus(
     branch: str | None = Query(None),
     semester: int | None = Query(None),
@@ -576,12 +1311,10 @@ def get_syllabus(
         query = query.filter(Syllabus.specialization == specialization)
     
     syllabus = query.all()
+    faculty_names = get_faculty_names(db, {s.faculty_id for s in syllabus if s.faculty_id})
     result = []
     for s in syllabus:
-        faculty_name = None
-        if s.faculty_id:
-            faculty = db.query(Faculty).filter(Faculty.id == s.faculty_id).first()
-            faculty_name = faculty.name if faculty else None
+        faculty_name = faculty_names.get(s.faculty_id) if s.faculty_id else None
         upload_date_str = (
             s.upload_date.isoformat() if hasattr(s.upload_date, 'isoformat') else str(s.upload_date)
         )
@@ -612,6 +1345,8 @@ def create_syllabus(entry: SyllabusCreate, db: Session = Depends(get_db)):
     new_entry = Syllabus(**entry_dict)
     db.add(new_entry)
     db.commit()
+    syllabus_reference_cache.invalidate()
+    bump_table_versions("syllabus")
     db.refresh(new_entry)
     # Convert upload_date to string for the response
     result = new_entry.__dict__.copy()
@@ -634,6 +1369,8 @@ def update_syllabus(syllabus_id: int, syllabus: dict = Body(...), db: Session =
                 setattr(db_syllabus, key, value)
 
         db.commit()
+        syllabus_reference_cache.invalidate()
+        bump_table_versions("syllabus")
         db.refresh(db_syllabus)
         return db_syllabus
     except Exception as e:
@@ -647,16 +1384,22 @@ def delete_syllabus(syllabus_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Syllabus entry not found")
     db.delete(syllabus)
     db.commit()
+    syllabus_reference_cache.invalidate()
+    bump_table_versions("syllabus")
     return {"success": True, "message": "Syllabus deleted successfully."}
 
 @app.get("/syllabus/subjects-faculty")
 def get_subjects_faculty(branch: str = Query(...), semester: int = Query(...), db: Session = Depends(get_db)):
-    syllabus = db.query(Syllabus).filter(Syllabus.branch == branch, Syllabus.semester == semester).all()
-    return [
-        {"subject": s.subject, "faculty_id": s.faculty_id} for s in syllabus
-    ]
+    def load():
+        syllabus = db.query(Syllabus.subject, Syllabus.faculty_id).filter(
+            Syllabus.branch == branch, Syllabus.semester == semester
+        ).all()
+        return [
+            {"subject": s.subject, "faculty_id": s.faculty_id} for s in syllabus
+        ]
+    return syllabus_reference_cache.get_or_load(("subjects_faculty", branch, semester), load)
 
-@app.get("/assignments")
+@app.get("/assignments", dependencies=[Depends(conditional_get("assignments"))])
 def get_assignments(db: Session = Depends(get_db)):
     assignments = db.query(Assignment).all()
     result = []
@@ -677,6 +1420,7 @@ def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db
     new_assignment = Assignment(**assignment.dict())
     db.add(new_assignment)
     db.commit()
+    bump_table_versions("assignments")
     db.refresh(new_assignment)
     return {
         "id": new_assignment.id,
@@ -697,6 +1441,7 @@ def update_assignment(assignment_id: int, assignment: AssignmentUpdate, db: Sess
     for key, value in assignment.dict().items():
         setattr(db_assignment, key, value)
     db.commit()
+    bump_table_versions("assignments")
     db.refresh(db_assignment)
     return {
         "id": db_assignment.id,
@@ -715,6 +1460,7 @@ def delete_assignment(assignment_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Assignment not found")
     db.delete(db_assignment)
     db.commit()
+    bump_table_versions("assignments")
     return {"success": True, "message": "Assignment deleted successfully."}
 
 @app.post("/students/bulk-delete")
@@ -731,6 +1477,7 @@ def bulk_delete_students(ids: dict = Body(...), db: Session = Depends(get_db)):
         
         # Delete attendance records
         db.query(Attendance).filter(Attendance.studentId.in_(student_ids)).delete(synchronize_session=False)
+        db.query(AttendanceSummary).filter(AttendanceSummary.studentId.in_(student_ids)).delete(synchronize_session=False)
         
         # Delete temporary attendance records
         db.query(TemporaryAttendance).filter(TemporaryAttendance.student_id.in_(student_ids)).delete(synchronize_session=False)
@@ -739,6 +1486,9 @@ def bulk_delete_students(ids: dict = Body(...), db: Session = Depends(get_db)):
         deleted_count = db.query(Student).filter(Student.studentId.in_(student_ids)).delete(synchronize_session=False)
         
         db.commit()
+        student_reference_cache.invalidate()
+        # Scans buffered for them on any worker would otherwise be written later
+        broadcast_threadsafe({"forget_students": student_ids}, QR_BUFFER_TOPIC)
         return {"success": True, "deleted": deleted_count, "message": f"Deleted {deleted_count} students."}
     except Exception as e:
         db.rollback()
@@ -761,7 +1511,7 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
         "upcomingEvents": upcoming_events
     }
 
-@app.get("/faculty")
+@app.get("/faculty", dependencies=[Depends(conditional_get("faculty"))])
 def get_faculty(db: Session = Depends(get_db)):
     faculty = db.query(Faculty).all()
     return faculty
@@ -786,6 +1536,7 @@ def create_faculty(faculty: FacultyCreate, db: Session = Depends(get_db)):
         db.add(db_faculty)
         db.commit()
         db.refresh(db_faculty)
+        invalidate_faculty_names()
         return db_faculty
     except Exception as e:
         db.rollback()
@@ -810,6 +1561,7 @@ def update_faculty(faculty_id: int, faculty: FacultyUpdate, db: Session = Depend
             setattr(db_faculty, key, value)
         
         db.commit()
+        invalidate_faculty_names()
         db.refresh(db_faculty)
         return db_faculty
     except Exception as e:
@@ -825,6 +1577,7 @@ def delete_faculty(faculty_id: int, db: Session = Depends(get_db)):
         
         db.delete(faculty)
         db.commit()
+        invalidate_faculty_names()
         return {"message": "Faculty deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -854,34 +1607,31 @@ def get_student_assignments(student_id: int, db: Session = Depends(get_db)):
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
 
-        # Get assignments for student's branch
-        query = db.query(Assignment).filter(
-            Assignment.branch == student.branch
-        )
+        # Get assignments for student's branch together with this student's
+        # submission status (at most one row per assignment, see uix_1)
+        query = db.query(Assignment, Submission.status)\
+            .outerjoin(Submission, and_(
+                Submission.assignment_id == Assignment.id,
+                Submission.student_id == student_id
+            ))\
+            .filter(Assignment.branch == student.branch)
 
         # If student has specialization, filter by it using syllabus table
         if student.specialization:
-            # Get subjects for the student's specialization
-            specialized_subjects = db.query(Syllabus.subject).filter(
+            # Subjects for the student's specialization
+            specialized_subjects = select(Syllabus.subject).where(
                 Syllabus.branch == student.branch,
                 Syllabus.specialization == student.specialization
-            ).all()
-            specialized_subjects = [s[0] for s in specialized_subjects]
+            )
             
             # If there are specialized subjects, filter assignments by them
-            if specialized_subjects:
-                query = query.filter(Assignment.subject.in_(specialized_subjects))
+            query = query.filter(or_(
+                Assignment.subject.in_(specialized_subjects),
+                ~specialized_subjects.exists()
+            ))
 
-        assignments = query.all()
         result = []
-        for a in assignments:
-            # Check if student has submitted this assignment
-            submission = db.query(Submission).filter(
-                Submission.assignment_id == a.id,
-                Submission.student_id == student_id
-            ).first()
-            
-            status = submission.status if submission else None
+        for a, status in query.all():
             result.append({
                 "id": a.id,
                 "title": a.title,
@@ -894,7 +1644,7 @@ def get_student_assignments(student_id: int, db: Session = Depends(get_db)):
             })
         return result
     except Exception as e:
-        print(f"Error getting student assignments: {str(e)}")
+        api_log.exception("Error getting student assignments")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/assignments/{assignment_id}/submit")
@@ -971,7 +1721,7 @@ def update_submission_status(submission_id: int, status_update: SubmissionStatus
                     # Update the file_url to None since file is deleted
                     submission.file_url = None
             except Exception as e:
-                print(f"Error deleting file: {e}")
+                api_log.warning("Error deleting file: %s", e)
                 # Continue with status update even if file deletion fails
         
         submission.status = status_update.status
@@ -986,11 +1736,38 @@ def update_submission_status(submission_id: int, status_update: SubmissionStatus
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/assignments")
-def get_admin_assignments(db: Session = Depends(get_db)):
-    assignments = db.query(Assignment).all()
+def get_admin_assignments(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    # Submission counts per assignment, broken down by status, in one grouped query
+    submission_counts = select(
+        Submission.assignment_id.label('assignment_id'),
+        func.count(Submission.id).label('total'),
+        func.sum(case((Submission.status == 'pending', 1), else_=0)).label('pending'),
+        func.sum(case((Submission.status == 'approved', 1), else_=0)).label('approved'),
+        func.sum(case((Submission.status == 'rejected', 1), else_=0)).label('rejected')
+    ).group_by(Submission.assignment_id).subquery()
+
+    query = db.query(
+        Assignment,
+        submission_counts.c.total,
+        submission_counts.c.pending,
+        submission_counts.c.approved,
+        submission_counts.c.rejected
+    ).outerjoin(submission_counts, submission_counts.c.assignment_id == Assignment.id)\
+        .order_by(Assignment.id)
+
+    # Paginate only when asked to, so existing callers still get every assignment
+    if limit is not None:
+        response.headers["X-Total-Count"] = str(db.query(func.count(Assignment.id)).scalar() or 0)
+        query = query.offset(offset).limit(limit)
+
     result = []
-    for a in assignments:
-        submission_count = db.query(func.count(Submission.id)).filter(Submission.assignment_id == a.id).scalar()
+    for a, total, pending, approved, rejected in query.all():
+        submission_count = int(total or 0)
         status = "submitted" if submission_count > 0 else "pending"
         result.append({
             "id": a.id,
@@ -1001,6 +1778,10 @@ def get_admin_assignments(db: Session = Depends(get_db)):
             "branch": a.branch,
             "due_date": a.due_date,
             "status": status,
+            "submissionCount": submission_count,
+            "pendingCount": int(pending or 0),
+            "approvedCount": int(approved or 0),
+            "rejectedCount": int(rejected or 0),
         })
     return result
 
@@ -1063,31 +1844,91 @@ def mark_attendance(
                 detail=f"Subject {attendance['subject']} is not valid for {student.branch} branch semester {student.semester}"
             )
 
-        # Check if attendance already exists
+        # Check if attendance already exists for this class session
+        class_type = attendance.get("class_type")
         existing_attendance = db.query(Attendance).filter(
             Attendance.studentId == attendance["student_id"],
             Attendance.subject_code == attendance["subject"],
-            Attendance.date == attendance["date"]
+            Attendance.date == attendance["date"],
+            Attendance.class_type == class_type
         ).first()
 
         if existing_attendance:
             # Update existing attendance
+            old_status = existing_attendance.attendance
             existing_attendance.attendance = attendance["status"]
         else:
             # Create new attendance record
+            old_status = None
             new_attendance = Attendance(
                 studentId=attendance["student_id"],
                 subject_code=attendance["subject"],
                 date=attendance["date"],
-                attendance=attendance["status"]
+                attendance=attendance["status"],
+                class_type=class_type
             )
             db.add(new_attendance)
-        
+
+        # The rollup is recomputed from Attendance, so the row must be written first
+        db.flush()
+        apply_attendance_changes(db, [
+            (attendance["student_id"], attendance["subject"], attendance["date"], old_status, attendance["status"])
+        ])
         db.commit()
         return {"message": "Attendance marked successfully"}
     except Exception as e:
         db.rollback()
-        print(f"Error marking attendance: {str(e)}")
+        attendance_log.exception("Error marking attendance")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/attendance/mark/bulk")
+def mark_attendance_bulk(payload: AttendanceBulkCreate, db: Session = Depends(get_db)):
+    try:
+        # Branch/semester combinations that teach this subject, validated once
+        valid_classes = set(db.query(Syllabus.branch, Syllabus.semester).filter(
+            Syllabus.subject == payload.subject
+        ).distinct().all())
+        if not valid_classes:
+            raise HTTPException(status_code=400, detail=f"Subject {payload.subject} is not in the syllabus")
+
+        # Validate every student with a single IN query
+        students = {
+            s.studentId: s
+            for s in db.query(Student.studentId, Student.branch, Student.semester).filter(
+                Student.studentId.in_({r.student_id for r in payload.records})
+            ).all()
+        }
+
+        statuses = {}
+        errors = []
+        for idx, record in enumerate(payload.records):
+            student = students.get(record.student_id)
+            if not student:
+                error = f"Student with ID {record.student_id} not found"
+            elif (student.branch, student.semester) not in valid_classes:
+                error = f"Subject {payload.subject} is not valid for {student.branch} branch semester {student.semester}"
+            elif record.student_id in statuses:
+                error = f"Duplicate entry for student {record.student_id}"
+            else:
+                statuses[record.student_id] = record.status
+                continue
+            errors.append({"row": idx + 1, "error": error, "data": record.dict()})
+
+        if statuses:
+            write_attendance_statuses(db, payload.subject, payload.date, payload.class_type, statuses)
+            db.commit()
+
+        return {
+            "success": True,
+            "marked": len(statuses),
+            "failed": len(errors),
+            "errors": errors
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        attendance_log.exception("Error marking attendance in bulk")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/dashboard/stats")
@@ -1184,7 +2025,7 @@ def get_faculty_dashboard_stats(faculty_id: int, db: Session = Depends(get_db)):
             "activeStudents": active_students
         }
     except Exception as e:
-        print(f"Error in faculty dashboard stats: {str(e)}")
+        api_log.exception("Error in faculty dashboard stats")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/faculty/{faculty_id}/timetable")
@@ -1204,7 +2045,7 @@ def get_faculty_timetable(faculty_id: int, db: Session = Depends(get_db)):
 
 @app.get("/faculty/{faculty_id}/subjects")
 def get_faculty_subjects(faculty_id: int, db: Session = Depends(get_db)):
-    try:
+    def load():
         # Get subjects from syllabus where faculty_id matches
         subjects = db.query(Syllabus.subject)\
             .filter(Syllabus.faculty_id == faculty_id)\
@@ -1213,12 +2054,15 @@ def get_faculty_subjects(faculty_id: int, db: Session = Depends(get_db)):
             .distinct()\
             .all()
         return [subject[0] for subject in subjects if subject[0] and subject[0].strip()]
+
+    try:
+        return syllabus_reference_cache.get_or_load(("faculty_subjects", faculty_id), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/specializations/{branch}")
 def get_specializations(branch: str, db: Session = Depends(get_db)):
-    try:
+    def load():
         # Get distinct specializations for the given branch from students table
         specializations = db.query(Student.specialization)\
             .filter(Student.branch == branch)\
@@ -1227,6 +2071,9 @@ def get_specializations(branch: str, db: Session = Depends(get_db)):
             .distinct()\
             .all()
         return [spec[0] for spec in specializations if spec[0] and spec[0].strip()]
+
+    try:
+        return student_reference_cache.get_or_load(("specializations", branch), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1236,7 +2083,7 @@ def get_student_specializations(
     semester: int = Query(...),
     db: Session = Depends(get_db)
 ):
-    try:
+    def load():
         # Get distinct specializations for the given branch and semester
         specializations = db.query(Student.specialization)\
             .filter(Student.branch == branch)\
@@ -1245,11 +2092,12 @@ def get_student_specializations(
             .filter(Student.specialization != '')\
             .distinct()\
             .all()
-        
+
         # Convert from list of tuples to list of strings and remove None/empty values
-        result = [spec[0] for spec in specializations if spec[0] and spec[0].strip()]
-        
-        return result
+        return [spec[0] for spec in specializations if spec[0] and spec[0].strip()]
+
+    try:
+        return student_reference_cache.get_or_load(("specializations", branch, semester), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1282,7 +2130,65 @@ def get_filtered_students(
             for student in students
         ]
     except Exception as e:
-        print(f"Error fetching students: {str(e)}")
+        api_log.exception("Error fetching students")
+        raise HTTPException(status_code=500, detail=str(e))
+
+STUDENT_SORT_FIELDS = ("studentId", "name", "registration_number", "email", "semester", "branch", "specialization", "starting_year", "passout_year")
+
+def _like_prefix(value: str):
+    """LIKE pattern matching values that start with ``value`` (wildcards escaped)"""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+@app.get("/students/search")
+def search_students(
+    response: Response,
+    q: str | None = Query(None, description="Prefix of the name, registration number or email"),
+    branch: List[str] = Query(None),
+    semester: List[int] = Query(None),
+    specialization: List[str] = Query(None),
+    starting_year: List[int] = Query(None),
+    passout_year: List[int] = Query(None),
+    sort: str = Query("name", description="Field to sort by, prefixed with - for descending"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    # Filters with several values (?branch=CSE&branch=ECE) match any of them;
+    # the total match count is returned in X-Total-Count
+    sort_field = sort.lstrip("-")
+    if sort_field not in STUDENT_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {sort_field}")
+    try:
+        filters = []
+        if q and q.strip():
+            pattern = _like_prefix(q.strip())
+            filters.append(or_(
+                Student.name.like(pattern, escape="\\"),
+                Student.registration_number.like(pattern, escape="\\"),
+                Student.email.like(pattern, escape="\\")
+            ))
+        for column, values in (
+            (Student.branch, branch),
+            (Student.semester, semester),
+            (Student.specialization, specialization),
+            (Student.starting_year, starting_year),
+            (Student.passout_year, passout_year),
+        ):
+            if values:
+                filters.append(column.in_(values))
+
+        response.headers["X-Total-Count"] = str(db.query(func.count(Student.studentId)).filter(*filters).scalar() or 0)
+
+        sort_column = getattr(Student, sort_field)
+        order = sort_column.desc() if sort.startswith("-") else sort_column.asc()
+        columns = [getattr(Student, field) for field in STUDENT_LIST_FIELDS]
+        rows = db.query(*columns).filter(*filters)\
+            .order_by(order, Student.studentId)\
+            .offset(offset).limit(limit).all()
+        return [dict(zip(STUDENT_LIST_FIELDS, row)) for row in rows]
+    except Exception as e:
+        api_log.exception("Error searching students")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/attendance/by-date-subject")
@@ -1308,7 +2214,7 @@ def get_attendance_by_date_subject(
             for record in attendance_records
         ]
     except Exception as e:
-        print(f"Error fetching attendance: {str(e)}")  # Add logging
+        attendance_log.exception("Error fetching attendance")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/attendance/{attendance_id}")
@@ -1322,12 +2228,20 @@ def update_attendance(
         if not db_attendance:
             raise HTTPException(status_code=404, detail="Attendance record not found")
         
+        previous = (db_attendance.studentId, db_attendance.subject_code, db_attendance.date, db_attendance.attendance)
+
         # Update the attendance record
-        db_attendance.student_id = attendance.student_id
+        db_attendance.studentId = attendance.student_id
         db_attendance.subject_code = attendance.subject
         db_attendance.date = attendance.date
         db_attendance.attendance = attendance.status
-        
+
+        # The rollup is recomputed from Attendance, so the row must be written first
+        db.flush()
+        apply_attendance_changes(db, [
+            (previous[0], previous[1], previous[2], previous[3], None),
+            (attendance.student_id, attendance.subject, attendance.date, None, attendance.status)
+        ])
         db.commit()
         return {"message": "Attendance updated successfully"}
     except Exception as e:
@@ -1371,7 +2285,7 @@ def check_attendance(
     db: Session = Depends(get_db)
 ):
     try:
-        print(f"Checking attendance for date: {date}, subject: {subject}, type: {type}")
+        attendance_log.debug("Checking attendance", extra={"date": date, "subject": subject, "class_type": type})
         
         # Validate date format
         try:
@@ -1386,7 +2300,7 @@ def check_attendance(
             Attendance.class_type == type  # Add class type filter
         ).all()
         
-        print(f"Found {len(attendance_records)} attendance records")
+        attendance_log.debug("Found %d attendance records", len(attendance_records))
         
         if attendance_records:
             return {
@@ -1401,14 +2315,14 @@ def check_attendance(
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Error checking attendance: {str(e)}")
+        attendance_log.exception("Error checking attendance")
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error while checking attendance: {str(e)}"
         )
 
-@app.get("/assignments/filtered")
+@app.get("/assignments/filtered", dependencies=[Depends(conditional_get("assignments"))])
 def get_filtered_assignments(
     branch: str = Query(None),
     semester: int = Query(None),
@@ -1459,9 +2373,103 @@ def get_student(student_id: int, db: Session = Depends(get_db)):
             "registration_number": student.registration_number
         }
     except Exception as e:
-        print(f"Error getting student details: {str(e)}")
+        api_log.exception("Error getting student details")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _student_filters(branch: str | None = None, semester: int | None = None, specialization: str | None = None):
+    """Build the Student filter list shared by the attendance analytics endpoints"""
+    student_filter = []
+    if branch:
+        student_filter.append(Student.branch == branch)
+    if semester:
+        student_filter.append(Student.semester == semester)
+    # Only filter by specialization if it's provided and not 'all'
+    if specialization and specialization.lower() != 'all':
+        student_filter.append(Student.specialization == specialization)
+    return student_filter
+
+def build_attendance_summary(
+    db: Session,
+    branch: str,
+    semester: int,
+    specialization: str | None = None
+):
+    """Per-student, per-subject attendance summary for a branch/semester.
+
+    Present/total counts come from the AttendanceSummary rollup, one row per
+    (studentId, subject_code), and the response is assembled in a single pass.
+    """
+    student_filter = _student_filters(branch, semester, specialization)
+    students = db.query(
+        Student.studentId,
+        Student.name,
+        Student.branch,
+        Student.semester,
+        Student.specialization
+    ).filter(*student_filter).all()
+
+    # Subjects for this branch and semester from syllabus
+    valid_subjects = select(Syllabus.subject).where(
+        Syllabus.branch == branch,
+        Syllabus.semester == semester
+    )
+
+    counts = db.query(
+        AttendanceSummary.studentId,
+        AttendanceSummary.subject_code,
+        AttendanceSummary.present_count,
+        AttendanceSummary.total_count
+    ).join(Student, Student.studentId == AttendanceSummary.studentId)\
+        .filter(*student_filter)\
+        .filter(AttendanceSummary.subject_code.in_(valid_subjects))\
+        .filter(AttendanceSummary.total_count > 0)\
+        .all()
+
+    # Group the aggregated counts by student, keeping subjects in first-seen order
+    counts_by_student = {}
+    subjects = {}
+    for student_id, subject, present_count, total_count in counts:
+        counts_by_student.setdefault(student_id, {})[subject] = (int(present_count or 0), int(total_count))
+        subjects[subject] = None
+
+    attendance_log.debug(
+        "Attendance summary for branch=%s, semester=%s, specialization=%s: %d students, %d subjects, %d rollup rows",
+        branch, semester, specialization, len(students), len(subjects), len(counts)
+    )
+
+    student_summaries = []
+    for student in students:
+        student_counts = counts_by_student.get(student.studentId, {})
+        subject_attendance = {}
+        total_present = 0
+        total_classes = 0
+        for subject in subjects:
+            present_count, subject_total = student_counts.get(subject, (0, 0))
+            subject_attendance[subject] = {
+                "present": present_count,
+                "total": subject_total,
+                "percentage": (present_count / subject_total) * 100 if subject_total > 0 else 0
+            }
+            total_present += present_count
+            total_classes += subject_total
+
+        # Calculate overall percentage only if there are classes
+        overall_percentage = (total_present / total_classes * 100) if total_classes > 0 else 0
+
+        student_summaries.append({
+            "studentId": student.studentId,
+            "name": student.name,
+            "branch": student.branch,
+            "semester": student.semester,
+            "specialization": student.specialization,
+            "subjects": subject_attendance,
+            "overallPercentage": overall_percentage,
+            "totalClasses": total_classes,
+            "totalPresent": total_present
+        })
+
+    return student_summaries
+
 @app.get("/attendance/student-summary")
 def get_student_attendance_summary(
     branch: str = Query(...),
@@ -1470,103 +2478,83 @@ def get_student_attendance_summary(
     db: Session = Depends(get_db)
 ):
     try:
-        print(f"Getting attendance summary for branch={branch}, semester={semester}, specialization={specialization}")
-        
-        # First get all students matching the criteria
-        student_query = db.query(Student).filter(
-            Student.branch == branch,
-            Student.semester == semester
-        )
-        
-        # Only filter by specialization if it's provided and not 'all'
-        if specialization and specialization.lower() != 'all':
-            student_query = student_query.filter(Student.specialization == specialization)
-            
-        students = student_query.all()
-        print(f"Found {len(students)} students matching criteria")
-
-        # Get all attendance records for these students in one query
-        student_ids = [student.studentId for student in students]
-        
-        # Get subjects for this branch and semester from syllabus
-        valid_subjects = db.query(Syllabus.subject).filter(
-            Syllabus.branch == branch,
-            Syllabus.semester == semester
-        ).all()
-        valid_subjects = [s[0] for s in valid_subjects]
-        print(f"Valid subjects for {branch} semester {semester}: {valid_subjects}")
+        return build_attendance_summary(db, branch, semester, specialization)
+    except Exception as e:
+        attendance_log.exception("Error getting student attendance summary")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Get attendance records filtered by student IDs and valid subjects
-        attendance_records = db.query(Attendance).filter(
-            Attendance.studentId.in_(student_ids),
-            Attendance.subject_code.in_(valid_subjects)
-        ).all()
-        print(f"Found {len(attendance_records)} attendance records")
-
-        # Get unique subjects from attendance records
-        subjects = list(set(record.subject_code for record in attendance_records))
-        print(f"Found subjects: {subjects}")
-
-        # Group attendance records by student
-        attendance_by_student = {}
-        for record in attendance_records:
-            if record.studentId not in attendance_by_student:
-                attendance_by_student[record.studentId] = []
-            attendance_by_student[record.studentId].append(record)
-
-        # Calculate summaries for each student
-        student_summaries = []
-        for student in students:
-            student_records = attendance_by_student.get(student.studentId, [])
-            print(f"Processing student {student.studentId} with {len(student_records)} records")
-            
-            subject_attendance = {}
-            for subject in subjects:
-                subject_records = [r for r in student_records if r.subject_code == subject]
-                total_classes = len(subject_records)
-                if total_classes == 0:
-                    subject_attendance[subject] = {
-                        "present": 0,
-                        "total": 0,
-                        "percentage": 0
-                    }
-                else:
-                    present_count = len([r for r in subject_records if r.attendance == 'P'])
-                    subject_attendance[subject] = {
-                        "present": present_count,
-                        "total": total_classes,
-                        "percentage": (present_count / total_classes) * 100
-                    }
-
-            # Calculate overall percentage only if there are classes
-            total_present = sum(data["present"] for data in subject_attendance.values())
-            total_classes = sum(data["total"] for data in subject_attendance.values())
-            overall_percentage = (total_present / total_classes * 100) if total_classes > 0 else 0
-
-            summary = {
-                "studentId": student.studentId,
-                "name": student.name,
-                "branch": student.branch,
-                "semester": student.semester,
-                "specialization": student.specialization,
-                "subjects": subject_attendance,
-                "overallPercentage": overall_percentage,
-                "totalClasses": total_classes,
-                "totalPresent": total_present
-            }
-            print(f"Student {student.studentId} summary: {summary}")
-            student_summaries.append(summary)
+@app.get("/metrics/pool")
+def get_pool_metrics():
+    """Connection pool usage, for sizing DB_POOL_SIZE against the worker count"""
+    return {
+        "settings": {
+            "poolSize": DB_POOL_SIZE,
+            "maxOverflow": DB_MAX_OVERFLOW,
+            "poolTimeout": DB_POOL_TIMEOUT,
+            "poolRecycle": DB_POOL_RECYCLE,
+            "prePing": DB_POOL_PRE_PING,
+        },
+        "sync": pool_stats.snapshot(),
+        "async": async_pool_stats.snapshot(),
+    }
 
-        return student_summaries
+def render_pool_metrics():
+    lines = []
+    gauges = (
+        ("db_pool_size", "gauge", "size", "Configured pool size."),
+        ("db_pool_checked_out", "gauge", "checkedOut", "Connections currently checked out."),
+        ("db_pool_overflow", "gauge", "overflow", "Overflow connections in use (negative: unused pool slots)."),
+        ("db_pool_checkouts_total", "counter", "checkouts", "Measured connection checkouts."),
+        ("db_pool_checkout_wait_seconds_total", "counter", "waitTotalSeconds", "Time spent waiting for a connection."),
+        ("db_pool_timeouts_total", "counter", "timeouts", "Checkouts that hit DB_POOL_TIMEOUT."),
+    )
+    snapshots = (("sync", pool_stats.snapshot()), ("async", async_pool_stats.snapshot()))
+    for name, kind, key, help_text in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for engine_name, snapshot in snapshots:
+            if snapshot[key] is not None:
+                lines.append(f'{name}{{engine="{engine_name}"}} {snapshot[key]}')
+    return lines
+
+def render_cache_metrics():
+    lines = []
+    snapshots = [(cache.name, cache.stats()) for cache in caches]
+    for name, kind, key, help_text in (
+        ("cache_hits_total", "counter", "hits", "Cache lookups served from memory."),
+        ("cache_misses_total", "counter", "misses", "Cache lookups that queried the database."),
+        ("cache_evictions_total", "counter", "evictions", "Entries evicted to stay under the size limit."),
+        ("cache_entries", "gauge", "entries", "Entries currently cached."),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for cache_name, stats in snapshots:
+            lines.append(f'{name}{{cache="{cache_name}"}} {stats[key]}')
+    return lines
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint (per-process; scrape each worker)"""
+    lines = request_metrics.render() + render_pool_metrics() + render_cache_metrics()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/attendance-rollup/rebuild")
+def rebuild_attendance_rollup_endpoint(db: Session = Depends(get_db)):
+    try:
+        rows = rebuild_attendance_rollup(db)
+        return {"success": True, "rows": rows}
     except Exception as e:
-        print(f"Error getting student attendance summary: {str(e)}")
+        db.rollback()
+        attendance_log.exception("Error rebuilding attendance rollup")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/branches")
 def get_branches(db: Session = Depends(get_db)):
     """Get all unique branches from the student table"""
-    branches = db.query(Student.branch).distinct().all()
-    return [branch[0] for branch in branches if branch[0]]  # Filter out None values
+    def load():
+        branches = db.query(Student.branch).distinct().all()
+        return [branch[0] for branch in branches if branch[0]]  # Filter out None values
+    return student_reference_cache.get_or_load(("branches",), load)
 
 @app.get("/students/{student_id}/assignments/{assignment_id}/status")
 def get_assignment_status(student_id: int, assignment_id: int, db: Session = Depends(get_db)):
@@ -1612,7 +2600,7 @@ def get_faculty_graph_data(faculty_id: int, db: Session = Depends(get_db)):
             "attendance": attendance_data
         }
     except Exception as e:
-        print(f"Error in faculty graph data: {str(e)}")
+        api_log.exception("Error in faculty graph data")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/graph-data")
@@ -1623,22 +2611,17 @@ def get_admin_graph_data(
     db: Session = Depends(get_db)
 ):
     try:
+        # Five grouped queries in total, independent of the number of students
+        student_filter = _student_filters(branch, semester, specialization)
+
         # Get all branches first
         all_branches = db.query(Student.branch).distinct().all()
         all_branches = [b[0] for b in all_branches]
 
-        # Base query for students
-        student_query = db.query(Student.branch, func.count(Student.studentId).label('count'))
-        
-        # Apply filters if provided
-        if branch:
-            student_query = student_query.filter(Student.branch == branch)
-        if semester:
-            student_query = student_query.filter(Student.semester == semester)
-        if specialization and specialization != 'all':
-            student_query = student_query.filter(Student.specialization == specialization)
-            
-        students_by_branch = student_query.group_by(Student.branch).all()
+        students_by_branch = db.query(Student.branch, func.count(Student.studentId).label('count'))\
+            .filter(*student_filter)\
+            .group_by(Student.branch)\
+            .all()
         students_by_branch = [{"branch": b, "count": c} for b, c in students_by_branch]
 
         # Faculty data
@@ -1663,41 +2646,24 @@ def get_admin_graph_data(
         assignments_by_subject = assignment_query.group_by(Assignment.subject).all()
         assignments_by_subject = [{"subject": s, "count": c} for s, c in assignments_by_subject]
 
-        # Initialize attendance data for all branches
-        attendance_by_branch = {b: {"present": 0, "total": 0} for b in all_branches}
-
-        # Get all students and their attendance
-        student_filter = []
-        if branch:
-            student_filter.append(Student.branch == branch)
-        if semester:
-            student_filter.append(Student.semester == semester)
-        if specialization and specialization != 'all':
-            student_filter.append(Student.specialization == specialization)
-
-        students = db.query(Student).filter(*student_filter).all()
-        
-        for student in students:
-            attendance_records = db.query(Attendance).filter(
-                Attendance.studentId == student.studentId
-            ).all()
-            
-            if attendance_records:
-                present_count = sum(1 for record in attendance_records if record.attendance == 'P')
-                total_count = len(attendance_records)
-                
-                if student.branch in attendance_by_branch:
-                    attendance_by_branch[student.branch]["present"] += present_count
-                    attendance_by_branch[student.branch]["total"] += total_count
+        # Present/total per branch from the attendance rollup
+        attendance_counts = db.query(
+            Student.branch,
+            func.sum(AttendanceSummary.present_count),
+            func.sum(AttendanceSummary.total_count)
+        ).join(AttendanceSummary, AttendanceSummary.studentId == Student.studentId)\
+            .filter(*student_filter)\
+            .group_by(Student.branch)\
+            .all()
+        attendance_counts = {b: (int(p or 0), int(t or 0)) for b, p, t in attendance_counts}
 
-        # Calculate percentages
+        # Calculate percentages for every branch, including ones without attendance
         attendance_data = []
-        for branch, counts in attendance_by_branch.items():
-            percentage = 0
-            if counts["total"] > 0:
-                percentage = (counts["present"] / counts["total"]) * 100
+        for branch_name in all_branches:
+            present_count, total_count = attendance_counts.get(branch_name, (0, 0))
+            percentage = (present_count / total_count) * 100 if total_count > 0 else 0
             attendance_data.append({
-                "branch": branch,
+                "branch": branch_name,
                 "percentage": round(percentage, 2)
             })
 
@@ -1709,7 +2675,7 @@ def get_admin_graph_data(
         }
 
     except Exception as e:
-        print(f"Error in get_admin_graph_data: {str(e)}")  # Add logging
+        api_log.exception("Error in get_admin_graph_data")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/admin/graph-data/assignments")
@@ -1750,74 +2716,29 @@ def get_admin_attendance_data(
     db: Session = Depends(get_db)
 ):
     try:
-        # Attendance data with filters
-        attendance_data = []
-        if branch or semester or (specialization and specialization != 'all'):
-            # Get filtered students
-            student_filter = []
-            if branch:
-                student_filter.append(Student.branch == branch)
-            if semester:
-                student_filter.append(Student.semester == semester)
-            if specialization and specialization != 'all':
-                student_filter.append(Student.specialization == specialization)
-                
-            students = db.query(Student).filter(*student_filter).all()
-            
-            for student in students:
-                # Get attendance for each student
-                attendance_records = db.query(Attendance).filter(
-                    Attendance.studentId == student.studentId
-                ).all()
-                
-                if attendance_records:
-                    present_count = sum(1 for record in attendance_records if record.attendance == 'P')
-                    total_count = len(attendance_records)
-                    percentage = (present_count / total_count * 100) if total_count > 0 else 0
-                    
-                    # Add to branch statistics
-                    branch_entry = next(
-                        (item for item in attendance_data if item["branch"] == student.branch),
-                        None
-                    )
-                    if branch_entry:
-                        branch_entry["total_percentage"] += percentage
-                        branch_entry["student_count"] += 1
-                    else:
-                        attendance_data.append({
-                            "branch": student.branch,
-                            "total_percentage": percentage,
-                            "student_count": 1
-                        })
-
-            # Calculate average percentage for each branch
-            attendance_by_branch = [
-                {
-                    "branch": item["branch"],
-                    "percentage": round(item["total_percentage"] / item["student_count"], 2) if item["student_count"] > 0 else 0
-                }
-                for item in attendance_data
-            ]
-        else:
-            # If no filters, get overall attendance by branch
-            attendance_by_branch = db.query(
-                Student.branch,
-                func.avg(
-                    func.case(
-                        (Attendance.attendance == 'P', 100),
-                        else_=0
-                    )
-                ).label('percentage')
-            ).join(
-                Attendance,
-                Student.studentId == Attendance.studentId,
-                isouter=True
-            ).group_by(Student.branch).all()
-            
-            attendance_by_branch = [
-                {"branch": branch, "percentage": round(float(percentage), 2) if percentage is not None else 0}
-                for branch, percentage in attendance_by_branch
-            ]
+        # Attendance percentage per student from the rollup, averaged per branch.
+        # Both filtered and unfiltered requests run this single grouped query.
+        student_percentage = select(
+            Student.branch.label('branch'),
+            (
+                func.sum(AttendanceSummary.present_count) * 100.0 / func.sum(AttendanceSummary.total_count)
+            ).label('percentage')
+        ).select_from(Student)\
+            .join(AttendanceSummary, AttendanceSummary.studentId == Student.studentId)\
+            .where(*_student_filters(branch, semester, specialization))\
+            .group_by(Student.studentId, Student.branch)\
+            .having(func.sum(AttendanceSummary.total_count) > 0)\
+            .subquery()
+
+        attendance_by_branch = db.query(
+            student_percentage.c.branch,
+            func.avg(student_percentage.c.percentage)
+        ).group_by(student_percentage.c.branch).all()
+
+        attendance_by_branch = [
+            {"branch": branch_name, "percentage": round(float(percentage), 2) if percentage is not None else 0}
+            for branch_name, percentage in attendance_by_branch
+        ]
 
         return {
             "attendanceByBranch": attendance_by_branch
@@ -1851,7 +2772,7 @@ def test_database(db: Session = Depends(get_db)):
             }
         }
     except Exception as e:
-        print(f"Database test error: {str(e)}")
+        api_log.exception("Database test error")
         return {
             "status": "error",
             "message": str(e)
@@ -2005,19 +2926,20 @@ def test_branch_counts(db: Session = Depends(get_db)):
             }
         }
 
+async def count_recipients(db: AsyncSession, target_audience: str):
+    if target_audience == 'all':
+        # Count all users
+        return await db.scalar(select(func.count(User.id)))
+    # Count users with matching specialization
+    return await db.scalar(
+        select(func.count(Student.studentId)).where(Student.specialization == target_audience)
+    )
+
 @app.post("/notifications")
-async def create_notification(notification: NotificationCreate, db: Session = Depends(get_db)):
+async def create_notification(notification: NotificationCreate, db: AsyncSession = Depends(get_async_db)):
     try:
         # Calculate recipients count based on target audience
-        recipients_count = 0
-        if notification.target_audience == 'all':
-            # Count all users
-            recipients_count = db.query(User).count()
-        else:
-            # Count users with matching specialization
-            recipients_count = db.query(Student).filter(
-                Student.specialization == notification.target_audience
-            ).count()
+        recipients_count = await count_recipients(db, notification.target_audience)
 
         new_notification = Notification(
             title=notification.title,
@@ -2032,35 +2954,51 @@ async def create_notification(notification: NotificationCreate, db: Session = De
         )
         
         db.add(new_notification)
-        db.commit()
-        db.refresh(new_notification)
+        await db.commit()
+        await db.refresh(new_notification)
+
+        if new_notification.status == "sent":
+            await broadcast({
+                "type": "notification",
+                "data": {
+                    "id": new_notification.id,
+                    "title": new_notification.title,
+                    "message": new_notification.message,
+                    "type": new_notification.type,
+                    "priority": new_notification.priority,
+                    "target_audience": new_notification.target_audience,
+                    "sent_at": new_notification.sent_at
+                }
+            }, topic=notification_topic(new_notification.target_audience))
         
         return {"success": True, "message": "Notification created successfully", "notification": new_notification}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/notifications")
-async def get_notifications(type: Optional[str] = None, user_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def get_notifications(type: Optional[str] = None, user_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
     try:
-        query = db.query(Notification)
+        query = select(Notification)
         
         # If type is specified and not 'all', filter by type
         if type and type != "all":
-            query = query.filter(Notification.type == type)
+            query = query.where(Notification.type == type)
             
         # If user_id is provided, get user's role and specialization
         if user_id:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.get(User, user_id)
             if not user:
                 # If user not found, return empty list
                 return {"success": True, "notifications": []}
                 
             # For students, only show notifications targeted to their specialization or 'all'
             if user.role == 'student':
-                student = db.query(Student).filter(Student.email == user.email).first()
+                student = (await db.execute(
+                    select(Student).where(Student.email == user.email)
+                )).scalars().first()
                 if student:
-                    query = query.filter(
+                    query = query.where(
                         or_(
                             Notification.target_audience == 'all',
                             Notification.target_audience == student.specialization
@@ -2073,74 +3011,69 @@ async def get_notifications(type: Optional[str] = None, user_id: Optional[int] =
             elif user.role == 'admin':
                 pass  # No additional filters needed
         
-        notifications = query.order_by(Notification.created_at.desc()).all()
+        notifications = (await db.execute(query.order_by(Notification.created_at.desc()))).scalars().all()
         return {"success": True, "notifications": notifications}
     except Exception as e:
-        print(f"Error in get_notifications: {str(e)}")  # Add logging
+        notifications_log.exception("Error in get_notifications")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/notifications/{notification_id}")
-async def delete_notification(notification_id: int, db: Session = Depends(get_db)):
+async def delete_notification(notification_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
         # First, delete all related read_notifications records
-        db.query(ReadNotification).filter(
+        await db.execute(delete(ReadNotification).where(
             ReadNotification.notification_id == notification_id
-        ).delete()
+        ))
 
         # Then delete the notification itself
-        notification = db.query(Notification).filter(Notification.id == notification_id).first()
+        notification = await db.get(Notification, notification_id)
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
         
-        db.delete(notification)
-        db.commit()
+        await db.delete(notification)
+        await db.commit()
         return {"success": True, "message": "Notification deleted successfully"}
     except Exception as e:
-        db.rollback()
-        print(f"Error deleting notification: {str(e)}")  # Add logging
+        await db.rollback()
+        notifications_log.exception("Error deleting notification")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/notifications/{notification_id}")
-async def update_notification(notification_id: int, notification: NotificationCreate, db: Session = Depends(get_db)):
+async def update_notification(notification_id: int, notification: NotificationCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_notification = db.query(Notification).filter(Notification.id == notification_id).first()
+        db_notification = await db.get(Notification, notification_id)
         if not db_notification:
             raise HTTPException(status_code=404, detail="Notification not found")
         
         # If target audience is changing, recalculate recipients count
+        recipients_count = None
         if notification.target_audience != db_notification.target_audience:
-            if notification.target_audience == 'all':
-                # Count all users
-                recipients_count = db.query(User).count()
-            else:
-                # Count users with matching specialization
-                recipients_count = db.query(Student).filter(
-                    Student.specialization == notification.target_audience
-                ).count()
-            notification.recipients_count = recipients_count
+            recipients_count = await count_recipients(db, notification.target_audience)
         
         for key, value in notification.dict().items():
             setattr(db_notification, key, value)
+        if recipients_count is not None:
+            db_notification.recipients_count = recipients_count
         
-        db.commit()
+        await db.commit()
         return {"message": "Notification updated successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: int, request: NotificationReadRequest, db: Session = Depends(get_db)):
+async def mark_notification_read(notification_id: int, request: NotificationReadRequest, db: AsyncSession = Depends(get_async_db)):
     try:
         # Check if notification exists
-        notification = db.query(Notification).filter(Notification.id == notification_id).first()
+        notification = await db.get(Notification, notification_id)
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
         
         # Check if already read
-        existing_read = db.query(ReadNotification).filter(
+        existing_read = (await db.execute(select(ReadNotification.id).where(
             ReadNotification.notification_id == notification_id,
             ReadNotification.user_id == request.user_id
-        ).first()
+        ))).first()
         
         if existing_read:
             return {"message": "Notification already marked as read"}
@@ -2152,78 +3085,562 @@ async def mark_notification_read(notification_id: int, request: NotificationRead
             read_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         )
         db.add(read_notification)
-        db.commit()
+        await db.commit()
         
         return {"message": "Notification marked as read"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/notifications/read-status/{user_id}")
-async def get_read_notifications(user_id: int, db: Session = Depends(get_db)):
+async def get_read_notifications(user_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        read_notifications = db.query(ReadNotification.notification_id).filter(
-            ReadNotification.user_id == user_id
-        ).all()
-        read_ids = [n.notification_id for n in read_notifications]
-        return {"read_notifications": read_ids}
+        read_ids = (await db.execute(
+            select(ReadNotification.notification_id).where(ReadNotification.user_id == user_id)
+        )).scalars().all()
+        return {"read_notifications": list(read_ids)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Full-text search over assignments, syllabus and notifications. MySQL uses
+# the FULLTEXT indexes on the tables themselves; SQLite keeps an FTS5 table,
+# search_index, whose rowid encodes (id, kind) as id * 4 + kind code.
+SEARCH_SOURCES = {
+    # kind: (rowid code, model, title column, body column)
+    "assignment": (1, Assignment, "title", "description"),
+    "syllabus": (2, Syllabus, "subject", "description"),
+    "notification": (3, Notification, "title", "message"),
+}
+search_index_table = sql_table("search_index", sql_column("rowid"), sql_column("title"), sql_column("body"))
+_search_index_ready = set()  # database URLs where search_index is known to exist
+
+def ensure_search_index(connection):
+    """Create the SQLite FTS5 table on first use"""
+    key = str(connection.engine.url)
+    if key not in _search_index_ready:
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(title, body, tokenize='unicode61')"
+        )
+        _search_index_ready.add(key)
+
+def _sync_search_document(connection, kind: str, target, deleted: bool = False):
+    if connection.dialect.name != "sqlite":
+        return
+    code, _, title_column, body_column = SEARCH_SOURCES[kind]
+    ensure_search_index(connection)
+    rowid = target.id * 4 + code
+    connection.execute(delete(search_index_table).where(search_index_table.c.rowid == rowid))
+    if not deleted:
+        connection.execute(insert(search_index_table).values(
+            rowid=rowid,
+            title=getattr(target, title_column) or "",
+            body=getattr(target, body_column) or ""
+        ))
+
+def _register_search_events(kind: str, model):
+    # Mapper events run inside the flush, so the index commits or rolls back
+    # with the row (for both the sync and async sessions)
+    @event.listens_for(model, "after_insert")
+    @event.listens_for(model, "after_update")
+    def index_document(mapper, connection, target):
+        _sync_search_document(connection, kind, target)
+
+    @event.listens_for(model, "after_delete")
+    def remove_document(mapper, connection, target):
+        _sync_search_document(connection, kind, target, deleted=True)
+
+for _kind, (_, _model, _, _) in SEARCH_SOURCES.items():
+    _register_search_events(_kind, _model)
+
+def rebuild_search_index(db: Session):
+    """Repopulate the SQLite search index from the source tables (MySQL FULLTEXT needs no rebuild)"""
+    connection = db.connection()
+    if connection.dialect.name != "sqlite":
+        return 0
+    ensure_search_index(connection)
+    connection.execute(delete(search_index_table))
+    documents = 0
+    for code, model, title_column, body_column in SEARCH_SOURCES.values():
+        documents += connection.execute(insert(search_index_table).from_select(
+            ["rowid", "title", "body"],
+            select(
+                model.id * 4 + code,
+                func.coalesce(getattr(model, title_column), ""),
+                func.coalesce(getattr(model, body_column), "")
+            )
+        )).rowcount
+    db.commit()
+    return documents
+
+def _search_scopes(db: Session, role: str | None, student_id: int | None, faculty_id: int | None):
+    """Filters limiting each kind to what the given role can see"""
+    if role == "student":
+        if student_id is None:
+            raise HTTPException(status_code=400, detail="student_id is required for role=student")
+        student = db.query(Student).filter(Student.studentId == student_id).first()
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
+        return {
+            "assignment": [
+                Assignment.branch == student.branch,
+                Assignment.semester == student.semester,
+                or_(Assignment.specialization.is_(None), Assignment.specialization == "",
+                    Assignment.specialization == student.specialization)
+            ],
+            "syllabus": [
+                Syllabus.branch == student.branch,
+                Syllabus.semester == student.semester,
+                or_(Syllabus.specialization.is_(None), Syllabus.specialization == "",
+                    Syllabus.specialization == student.specialization)
+            ],
+            "notification": [
+                Notification.status == "sent",
+                Notification.target_audience.in_(["all", student.specialization])
+            ],
+        }
+    if role == "faculty":
+        if faculty_id is None:
+            raise HTTPException(status_code=400, detail="faculty_id is required for role=faculty")
+        return {
+            "assignment": [Assignment.faculty_id == faculty_id],
+            "syllabus": [Syllabus.faculty_id == faculty_id],
+            "notification": [Notification.status == "sent"],
+        }
+    return {kind: [] for kind in SEARCH_SOURCES}
+
+def _search_result(kind: str, row, score: float):
+    # Rounded for display only; results are ranked on the raw score
+    result = {"type": kind, "id": row.id, "score": round(score, 6)}
+    if kind == "assignment":
+        result.update(title=row.title, text=row.description, subject=row.subject,
+                      branch=row.branch, semester=row.semester, due_date=row.due_date)
+    elif kind == "syllabus":
+        result.update(title=row.subject, text=row.description, code=row.code,
+                      branch=row.branch, semester=row.semester, pdf_url=row.pdf_url)
+    else:
+        result.update(title=row.title, text=row.message, notification_type=row.type,
+                      priority=row.priority, created_at=row.created_at)
+    return result
+
+@app.get("/search")
+def search(
+    q: str = Query(..., min_length=1),
+    types: List[str] = Query(None, description="assignment, syllabus and/or notification"),
+    role: str | None = Query(None, pattern="^(student|faculty|admin)$"),
+    student_id: int | None = Query(None),
+    faculty_id: int | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    # Every word must match, as a prefix ("assig data" finds "Assignment 3: Data ...").
+    # Each kind is ranked by the database and the kinds are merged by score,
+    # which is only approximately comparable across kinds: SQLite's bm25 runs
+    # over one index shared by every kind, but MySQL scores each table against
+    # its own FULLTEXT statistics.
+    kinds = types or list(SEARCH_SOURCES)
+    unknown = [kind for kind in kinds if kind not in SEARCH_SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(unknown)}")
+    words = re.findall(r"\w+", q)
+    if not words:
+        return []
+    scopes = _search_scopes(db, role, student_id, faculty_id)
+
+    try:
+        dialect = db.get_bind().dialect.name
+        matches = []
+        for kind in kinds:
+            code, model, title_column, body_column = SEARCH_SOURCES[kind]
+            if dialect == "mysql":
+                score = mysql_match(
+                    getattr(model, title_column), getattr(model, body_column),
+                    against=" ".join(f"+{word}*" for word in words)
+                ).in_boolean_mode()
+                query = db.query(model, score).filter(score > 0)
+            elif dialect == "sqlite":
+                ensure_search_index(db.connection())
+                # bm25() is lower for better matches; the title counts double
+                score = -func.bm25(literal_column("search_index"), 2.0, 1.0)
+                query = db.query(model, score).join(
+                    search_index_table, model.id == (search_index_table.c.rowid - code) // 4
+                ).filter(
+                    literal_column("search_index").op("MATCH")(" ".join(f'"{word}"*' for word in words)),
+                    search_index_table.c.rowid % 4 == code
+                )
+            else:
+                raise HTTPException(status_code=501, detail=f"Search is not supported on {dialect}")
+            rows = query.filter(*scopes[kind]).order_by(score.desc()).limit(limit).all()
+            matches.extend((float(row_score), kind, row) for row, row_score in rows)
+
+        # Exact ties are broken by kind and id so paging through them is stable
+        matches.sort(key=lambda match: (-match[0], match[1], match[2].id))
+        return [_search_result(kind, row, row_score) for row_score, kind, row in matches[:limit]]
+    except HTTPException:
+        raise
     except Exception as e:
+        api_log.exception("Error searching")
         raise HTTPException(status_code=500, detail=str(e))
 
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "1000"))
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+WS_BATCH_INTERVAL_MS = float(os.getenv("WS_BATCH_INTERVAL_MS", "200"))
+WS_BATCH_MAX_EVENTS = int(os.getenv("WS_BATCH_MAX_EVENTS", "50"))
+
+def qr_session_topic(subject: str, date: str, class_type: str):
+    return f"qr:{subject}:{date}:{class_type}"
+
+def notification_topic(target_audience: str):
+    return f"notifications:{target_audience}"
+
+class ClientConnection:
+    def __init__(self, websocket: WebSocket, batched: bool = False):
+        self.websocket = websocket
+        self.batched = batched  # receive coalesced "<type>_batch" frames
+        self.topics = set()
+        # Bounded so one slow client can't hold messages for everyone else
+        self.queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.sender = None
+
 class ConnectionManager:
+    """WebSocket connections with topic subscriptions.
+
+    Each connection has its own bounded send queue drained by a sender task,
+    so broadcasting only enqueues. A connection whose queue overflows or whose
+    send times out is disconnected. Connections that never subscribe get
+    every message (the ALL_TOPICS subscription) for older clients.
+
+    Batched connections receive COALESCED_TYPES events as one
+    ``{"type": "<type>_batch", "topic": ..., "data": [...]}`` frame per topic
+    every WS_BATCH_INTERVAL_MS or WS_BATCH_MAX_EVENTS events; everyone else
+    keeps getting one frame per event.
+    """
+    ALL_TOPICS = "*"
+    COALESCED_TYPES = {"qr_scan"}
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.connections = {}  # WebSocket -> ClientConnection
+        self.subscribers = {}  # topic -> set of ClientConnection
+        self.batches = {}  # topic -> pending events for batched connections
+        self.batch_timers = {}  # topic -> asyncio.TimerHandle
+        self.tasks = set()  # closes in flight; the loop only keeps weak references
 
-    async def connect(self, websocket: WebSocket):
+    @property
+    def active_connections(self):
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket, topics=(), batched: bool = False):
         try:
             await websocket.accept()
-            self.active_connections.append(websocket)
-            print(f"New WebSocket connection. Total connections: {len(self.active_connections)}")
         except Exception as e:
-            print(f"Error accepting WebSocket connection: {str(e)}")
+            ws_log.exception("Error accepting WebSocket connection")
             raise
+        connection = ClientConnection(websocket, batched)
+        self.connections[websocket] = connection
+        self.subscribe(websocket, topics or [self.ALL_TOPICS])
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        ws_log.info("WebSocket connected", extra={"connections": len(self.connections)})
+
+    def subscribe(self, websocket: WebSocket, topics):
+        connection = self.connections.get(websocket)
+        if not connection:
+            return
+        topics = set(topics)
+        # An explicit subscription replaces the catch-all one
+        if topics - {self.ALL_TOPICS}:
+            self.unsubscribe(websocket, [self.ALL_TOPICS])
+        for topic in topics:
+            self.subscribers.setdefault(topic, set()).add(connection)
+        connection.topics |= topics
+
+    def unsubscribe(self, websocket: WebSocket, topics):
+        connection = self.connections.get(websocket)
+        if not connection:
+            return
+        for topic in topics:
+            subscribers = self.subscribers.get(topic)
+            if subscribers:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.subscribers[topic]
+        connection.topics -= set(topics)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            print(f"WebSocket disconnected. Remaining connections: {len(self.active_connections)}")
-
-    async def broadcast(self, message: dict):
-        print(f"Broadcasting message to {len(self.active_connections)} connections:", message)
-        disconnected = []
-        for connection in self.active_connections:
+        connection = self.connections.get(websocket)
+        if not connection:
+            return
+        self.unsubscribe(websocket, list(connection.topics))
+        del self.connections[websocket]
+        if connection.sender and connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
+        ws_log.info("WebSocket disconnected", extra={"connections": len(self.connections)})
+
+    def _targets(self, topic: str | None):
+        if topic is None:
+            return list(self.connections.values())
+        return list(self.subscribers.get(topic, set()) | self.subscribers.get(self.ALL_TOPICS, set()))
+
+    async def broadcast(self, message: dict, topic: str | None = None):
+        """Queue a message for subscribers of ``topic`` (every connection if None)"""
+        coalesce = message.get("type") in self.COALESCED_TYPES
+        has_batched = False
+        for connection in self._targets(topic):
+            if coalesce and connection.batched:
+                has_batched = True
+                continue
+            self._enqueue(connection, message)
+        if has_batched:
+            self._add_to_batch(topic, message)
+
+    def _enqueue(self, connection: ClientConnection, message: dict):
+        try:
+            connection.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            ws_log.warning("WebSocket send queue full, dropping slow connection")
+            self._drop(connection, code=1013)
+
+    def _add_to_batch(self, topic: str | None, message: dict):
+        events = self.batches.setdefault(topic, [])
+        events.append(message)
+        if len(events) >= WS_BATCH_MAX_EVENTS:
+            self._flush_batch(topic)
+        elif topic not in self.batch_timers:
+            self.batch_timers[topic] = asyncio.get_running_loop().call_later(
+                WS_BATCH_INTERVAL_MS / 1000, self._flush_batch, topic
+            )
+
+    def _flush_batch(self, topic: str | None):
+        timer = self.batch_timers.pop(topic, None)
+        if timer:
+            timer.cancel()
+        events = self.batches.pop(topic, None)
+        if not events:
+            return
+        frame = {
+            "type": f"{events[0]['type']}_batch",
+            "topic": topic,
+            "data": [event.get("data") for event in events]
+        }
+        for connection in self._targets(topic):
+            if connection.batched:
+                self._enqueue(connection, frame)
+
+    def _drop(self, connection: ClientConnection, code: int = 1011):
+        self.disconnect(connection.websocket)
+        task = asyncio.create_task(self._close(connection.websocket, code))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def _send_loop(self, connection: ClientConnection):
+        while True:
+            message = await connection.queue.get()
             try:
-                await connection.send_json(message)
+                await asyncio.wait_for(connection.websocket.send_json(message), timeout=WS_SEND_TIMEOUT_SECONDS)
             except Exception as e:
-                print(f"Error broadcasting to connection: {str(e)}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected connections
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
+                ws_log.warning("Error broadcasting to connection: %s", e)
+                self._drop(connection)
+                return
 
 manager = ConnectionManager()
 
+class BroadcastBackend:
+    """Carries broadcasts to the ConnectionManager of every worker.
+
+    ``deliver(message, topic)`` hands a message to this worker's sockets.
+    """
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self.loop = None  # set while started; threadpool handlers publish through it
+        self.tasks = set()  # publishes and deliveries in flight; the loop only keeps weak references
+
+    def track(self, task):
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, message: dict, topic: str | None = None):
+        raise NotImplementedError
+
+class InProcessBroadcastBackend(BroadcastBackend):
+    """Single worker: publishing is local delivery"""
+    async def publish(self, message: dict, topic: str | None = None):
+        await self.deliver(message, topic)
+
+class UnixSocketBroadcastBackend(BroadcastBackend):
+    """Brokerless fan-out between workers on one host.
+
+    Every worker binds a datagram socket named after its pid in
+    BROADCAST_SOCKET_DIR and publishes by delivering locally and sending the
+    message to every other socket in the directory. Sockets left behind by
+    dead workers are removed when a send to them is refused.
+    """
+    MAX_DATAGRAM = 65536
+
+    def __init__(self, deliver, directory: str):
+        super().__init__(deliver)
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self.sock = None
+
+    async def start(self):
+        import socket
+
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.sock.fileno(), self._on_readable)
+
+    async def stop(self):
+        if self.sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self.sock.fileno())
+        self.sock.close()
+        self.sock = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = self.sock.recv(self.MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                envelope = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            self.track(asyncio.create_task(self.deliver(envelope["message"], envelope.get("topic"))))
+
+    async def publish(self, message: dict, topic: str | None = None):
+        await self.deliver(message, topic)
+        if self.sock is None:
+            return
+        data = json.dumps({"topic": topic, "message": message}, default=str).encode()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".sock") or path == self.path:
+                continue
+            try:
+                self.sock.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # No worker behind this socket any more
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                # Receiver's buffer is full or the message is too large
+                ws_log.warning("Error publishing broadcast to %s: %s", name, e)
+
+async def deliver_broadcast(message: dict, topic: str | None = None):
+    """Local delivery for the broadcast backend; internal topics never reach WebSockets"""
+    if topic == TABLE_VERSION_TOPIC:
+        # Our own bumps were applied when they were published
+        if message.get("origin") != BOOT_NONCE:
+            table_versions.bump(message.get("tables", []))
+        return
+    if topic == QR_BUFFER_TOPIC:
+        qr_scan_buffer.apply_message(message)
+        return
+    await manager.broadcast(message, topic)
+
+def create_broadcast_backend():
+    backend = os.getenv("BROADCAST_BACKEND", "memory").lower()
+    if backend == "unix":
+        import tempfile
+        directory = os.getenv("BROADCAST_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "campus-broadcast"))
+        return UnixSocketBroadcastBackend(deliver_broadcast, directory)
+    if backend != "memory":
+        raise ValueError(f"Unknown BROADCAST_BACKEND {backend!r}, expected 'memory' or 'unix'")
+    return InProcessBroadcastBackend(deliver_broadcast)
+
+broadcast_backend = create_broadcast_backend()
+
+async def broadcast(message: dict, topic: str | None = None):
+    """Send a message to WebSocket subscribers of ``topic`` on every worker"""
+    await broadcast_backend.publish(message, topic)
+
+def broadcast_threadsafe(message: dict, topic: str | None = None):
+    """Schedule broadcast() from a threadpool handler or the event loop.
+
+    Does nothing before startup or after shutdown.
+    """
+    loop = broadcast_backend.loop
+    if loop is None or loop.is_closed():
+        return
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        broadcast_backend.track(loop.create_task(broadcast(message, topic)))
+    else:
+        asyncio.run_coroutine_threadsafe(broadcast(message, topic), loop)
+
+@app.on_event("startup")
+async def start_broadcast_backend():
+    broadcast_backend.loop = asyncio.get_running_loop()
+    await broadcast_backend.start()
+    if multiple_workers() and isinstance(broadcast_backend, InProcessBroadcastBackend):
+        # Other workers' writes would never invalidate this worker's ETags
+        table_versions.enabled = False
+        api_log.warning("ETags disabled: several workers without a shared BROADCAST_BACKEND")
+
+@app.on_event("shutdown")
+async def stop_broadcast_backend():
+    broadcast_backend.loop = None
+    await broadcast_backend.stop()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    # Topics can be given up front (/ws?topic=...&topic=...) or later with
+    # {"action": "subscribe" | "unsubscribe", "topics": [...]} messages.
+    # /ws?batch=1 opts in to coalesced scan batches.
     try:
-        await manager.connect(websocket)
-        print("WebSocket connected successfully")
+        await manager.connect(
+            websocket,
+            websocket.query_params.getlist("topic"),
+            batched=websocket.query_params.get("batch", "").lower() in ("1", "true", "yes")
+        )
+        ws_log.debug("WebSocket subscribed", extra={"topics": websocket.query_params.getlist("topic")})
         
         while True:
             try:
                 data = await websocket.receive_text()
-                print("Received WebSocket message:", data)
             except WebSocketDisconnect:
                 manager.disconnect(websocket)
                 break
             except Exception as e:
-                print(f"Error in WebSocket communication: {str(e)}")
+                ws_log.warning("Error in WebSocket communication: %s", e)
                 manager.disconnect(websocket)
                 break
+
+            try:
+                request = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(request, dict):
+                continue
+            topics = request.get("topics") or []
+            if request.get("action") == "subscribe":
+                manager.subscribe(websocket, topics)
+            elif request.get("action") == "unsubscribe":
+                manager.unsubscribe(websocket, topics)
     except Exception as e:
-        print(f"WebSocket connection error: {str(e)}")
+        ws_log.warning("WebSocket connection error: %s", e)
         if websocket in manager.active_connections:
             manager.disconnect(websocket)
 
@@ -2237,13 +3654,273 @@ class TemporaryAttendance(Base):
     scan_timestamp = Column(String(50), nullable=False)
     class_type = Column(String(50), nullable=False)  # Add class type field
 
-# Update the QR scan endpoint to use SQLAlchemy
+QR_SCAN_FLUSH_SIZE = int(os.getenv("QR_SCAN_FLUSH_SIZE", "25"))
+QR_SCAN_FLUSH_SECONDS = float(os.getenv("QR_SCAN_FLUSH_SECONDS", "2"))
+QR_SESSION_IDLE_SECONDS = float(os.getenv("QR_SESSION_IDLE_SECONDS", "21600"))
+# Write every scan before acknowledging it; defaults to on with several workers
+QR_BUFFER_WRITE_THROUGH = os.getenv("QR_BUFFER_WRITE_THROUGH", "").lower()
+# Session drops and student deletions, shared with the other workers' buffers
+QR_BUFFER_TOPIC = "_internal:qr-buffer"
+
+class QRScanSession:
+    def __init__(self, subject: str, date: str, class_type: str):
+        self.subject = subject
+        self.date = date
+        self.class_type = class_type
+        self.roster = {}  # student_id -> (name, registration_number)
+        self.scanned = set()
+        self.pending = []  # TemporaryAttendance rows not yet written
+        self.loaded = False  # roster and persisted scans read
+        self.closed = False  # drained by finalize
+        # Held while the roster loads and while rows are written
+        self.lock = asyncio.Lock()
+        self.timer = None  # pending QR_SCAN_FLUSH_SECONDS flush
+        self.last_seen = time.monotonic()
+
+class QRScanBuffer:
+    """Active QR attendance sessions keyed by (subject, date, class type).
+
+    Scans are de-duplicated in memory against the session, student names come
+    from a roster loaded once per session, and TemporaryAttendance rows are
+    written in batches of QR_SCAN_FLUSH_SIZE, or QR_SCAN_FLUSH_SECONDS after
+    the first unwritten scan.
+
+    Batching is only safe in a single worker: finalize reads this worker's
+    buffer and the database, nothing else. With several workers (see
+    multiple_workers(), or QR_BUFFER_WRITE_THROUGH) every scan is written before it is acknowledged
+    and checked against the scans other workers have written, so the
+    buffer is only a cache of the roster and of ids already seen.
+
+    Only used from the event loop, but scans interleave at every database
+    await: a session is registered before its roster is loaded (other scans
+    wait on its lock), membership is re-checked after each await, and a
+    flush takes the pending list before writing it.
+    """
+    def __init__(self, write_through: bool = False):
+        self.sessions = {}
+        self.write_through = write_through
+        self.tasks = set()  # timed flushes in flight
+
+    def _load(self, db: Session, session: QRScanSession, qr_data: dict):
+        # Roster of the class the QR code was generated for
+        session.roster.update({
+            row.studentId: (row.name, row.registration_number)
+            for row in db.query(Student.studentId, Student.name, Student.registration_number).filter(
+                Student.branch == qr_data["branch"],
+                Student.semester == int(qr_data["semester"])
+            ).all()
+        })
+        # Scans already persisted, e.g. before a restart
+        session.scanned.update(
+            student_id for (student_id,) in db.query(TemporaryAttendance.student_id).filter(
+                TemporaryAttendance.subject == session.subject,
+                TemporaryAttendance.date == parse_date(session.date),
+                TemporaryAttendance.class_type == session.class_type
+            ).all()
+        )
+
+    async def _session_for(self, db: AsyncSession, qr_data: dict):
+        key = (qr_data["subject"], qr_data["date"], qr_data["type"])
+        session = self.sessions.get(key)
+        if session is None:
+            # Registered before any await so concurrent scans share it
+            session = self.sessions[key] = QRScanSession(*key)
+            await self._evict_idle(db)
+        session.last_seen = time.monotonic()
+        if not session.loaded:
+            async with session.lock:
+                if not session.loaded:
+                    await db.run_sync(self._load, session, qr_data)
+                    session.loaded = True
+        return session
+
+    async def record_scan(self, db: AsyncSession, qr_data: dict, student_id: int):
+        """Register a scan and return the student's (name, registration_number)"""
+        session = await self._session_for(db, qr_data)
+        if student_id in session.scanned:
+            raise HTTPException(status_code=400, detail="Attendance already marked for this class")
+
+        student = session.roster.get(student_id)
+        if student is None:
+            # Not in the class roster; fall back to a direct lookup
+            row = (await db.execute(select(Student.name, Student.registration_number).where(
+                Student.studentId == student_id
+            ))).first()
+            if not row:
+                raise HTTPException(status_code=404, detail="Student not found")
+            student = session.roster[student_id] = (row.name, row.registration_number)
+            # Another request for this student may have got in during the lookup
+            if student_id in session.scanned:
+                raise HTTPException(status_code=400, detail="Attendance already marked for this class")
+        if self.write_through:
+            # Scanned on another worker
+            persisted = (await db.execute(select(TemporaryAttendance.id).where(
+                TemporaryAttendance.student_id == student_id,
+                TemporaryAttendance.subject == session.subject,
+                TemporaryAttendance.date == parse_date(session.date),
+                TemporaryAttendance.class_type == session.class_type
+            ).limit(1))).first()
+            if persisted or student_id in session.scanned:
+                session.scanned.add(student_id)
+                raise HTTPException(status_code=400, detail="Attendance already marked for this class")
+        if session.closed:
+            raise HTTPException(status_code=409, detail="Attendance for this class has already been finalized")
+
+        session.scanned.add(student_id)
+        session.pending.append({
+            "student_id": student_id,
+            "subject": session.subject,
+            "date": parse_date(session.date),
+            "scan_timestamp": datetime.now().isoformat(),
+            "class_type": session.class_type
+        })
+        if self.write_through:
+            try:
+                await self.flush(db, session)
+            except Exception:
+                # Not acknowledged, so the student can scan again
+                session.scanned.discard(student_id)
+                session.pending = [row for row in session.pending if row["student_id"] != student_id]
+                raise
+        elif len(session.pending) >= QR_SCAN_FLUSH_SIZE:
+            try:
+                await self.flush(db, session)
+            except Exception:
+                # The scan is kept in memory and written by the next flush
+                qr_log.exception("Error flushing QR scans")
+        else:
+            self._schedule_flush(session)
+        return student
+
+    def _schedule_flush(self, session: QRScanSession):
+        if session.timer is None and not session.closed and session.pending:
+            session.timer = asyncio.get_running_loop().call_later(
+                QR_SCAN_FLUSH_SECONDS, self._start_timed_flush, session
+            )
+
+    def _start_timed_flush(self, session: QRScanSession):
+        session.timer = None
+        task = asyncio.create_task(self._timed_flush(session))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _timed_flush(self, session: QRScanSession):
+        async with AsyncSessionLocal() as db:
+            try:
+                await self.flush(db, session)
+            except Exception:
+                qr_log.exception("Error flushing QR scans")
+
+    async def flush(self, db: AsyncSession, session: QRScanSession):
+        async with session.lock:
+            if session.timer is not None:
+                session.timer.cancel()
+                session.timer = None
+            # A drained session's scans are written by finalize
+            if session.closed:
+                return
+            rows, session.pending = session.pending, []
+            if not rows:
+                return
+            try:
+                await db.execute(insert(TemporaryAttendance), rows)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                session.pending[:0] = rows
+                # Retried by the timer unless a scan flushes first
+                self._schedule_flush(session)
+                raise
+
+    def flush_all(self, db: Session):
+        """Write every pending row synchronously, e.g. at shutdown"""
+        for session in list(self.sessions.values()):
+            rows, session.pending = session.pending, []
+            if rows:
+                db.execute(insert(TemporaryAttendance), rows)
+        db.commit()
+
+    async def drain(self, subject: str, date: str, class_type: str):
+        """Close and return a session (or None); its unflushed rows are not written.
+
+        Waits for an in-flight load or flush of the session to finish.
+        """
+        session = self.sessions.pop((subject, date, class_type), None)
+        if session is not None:
+            session.closed = True
+            if session.timer is not None:
+                session.timer.cancel()
+                session.timer = None
+            async with session.lock:
+                pass
+        return session
+
+    def forget_students(self, student_ids):
+        """Drop buffered scans of deleted students"""
+        student_ids = set(student_ids)
+        for session in self.sessions.values():
+            session.scanned -= student_ids
+            session.pending = [row for row in session.pending if row["student_id"] not in student_ids]
+            for student_id in student_ids:
+                session.roster.pop(student_id, None)
+
+    def apply_message(self, message: dict):
+        """Apply a QR_BUFFER_TOPIC message, published by this or another worker"""
+        if message.get("drop_session"):
+            # Finalized (here it is already drained); the next scan starts a fresh session
+            session = self.sessions.pop(tuple(message["drop_session"]), None)
+            if session is not None:
+                session.closed = True
+                if session.timer is not None:
+                    session.timer.cancel()
+                    session.timer = None
+        if message.get("forget_students"):
+            self.forget_students(message["forget_students"])
+
+    def restore(self, session: QRScanSession):
+        """Put a drained session back, e.g. after a failed finalize"""
+        session.closed = False
+        key = (session.subject, session.date, session.class_type)
+        current = self.sessions.setdefault(key, session)
+        if current is not session:
+            # Scans arrived in the meantime and opened a new session
+            current.scanned |= session.scanned
+            current.pending[:0] = session.pending
+            session = current
+        self._schedule_flush(session)
+
+    async def _evict_idle(self, db: AsyncSession):
+        now = time.monotonic()
+        for key, session in list(self.sessions.items()):
+            if now - session.last_seen > QR_SESSION_IDLE_SECONDS:
+                await self.flush(db, session)
+                self.sessions.pop(key, None)
+
+qr_scan_buffer = QRScanBuffer(write_through=(
+    QR_BUFFER_WRITE_THROUGH in ("1", "true", "yes", "on")
+    if QR_BUFFER_WRITE_THROUGH else multiple_workers()
+))
+
+def parse_date(value):
+    """TemporaryAttendance.date is a DATE column; QR payloads carry YYYY-MM-DD strings"""
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+@app.on_event("shutdown")
+def flush_qr_scans():
+    db = SessionLocal()
+    try:
+        qr_scan_buffer.flush_all(db)
+    finally:
+        db.close()
+
 @app.post("/attendance/qr-scans")
-async def process_qr_scan(request: Request, db: Session = Depends(get_db)):
+async def process_qr_scan(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         # Get the raw request body
         body = await request.json()
-        print("Received QR scan request:", body)
+        qr_log.debug("Received QR scan request", extra={"body": body})
         
         # Extract QR data and student ID
         qr_data_str = body.get("qrData")
@@ -2251,13 +3928,15 @@ async def process_qr_scan(request: Request, db: Session = Depends(get_db)):
         
         if not qr_data_str:
             raise HTTPException(status_code=400, detail="QR data not provided")
+        if student_id is None:
+            raise HTTPException(status_code=400, detail="Student ID not provided")
             
         # Parse QR data
         try:
             qr_data = json.loads(qr_data_str)
-            print("Parsed QR data:", qr_data)
+            qr_log.debug("Parsed QR data", extra={"qr_data": qr_data})
         except json.JSONDecodeError as e:
-            print("Error parsing QR data:", str(e))
+            qr_log.warning("Error parsing QR data: %s", e)
             raise HTTPException(status_code=400, detail="Invalid QR data format")
 
         # Validate required fields
@@ -2268,66 +3947,86 @@ async def process_qr_scan(request: Request, db: Session = Depends(get_db)):
                 status_code=400,
                 detail=f"Missing required fields in QR data: {', '.join(missing_fields)}"
             )
-            
-        # Check for duplicate scan
-        existing_scan = db.query(TemporaryAttendance).filter(
-            TemporaryAttendance.student_id == student_id,
-            TemporaryAttendance.subject == qr_data["subject"],
-            TemporaryAttendance.date == qr_data["date"]
-        ).first()
-        
-        if existing_scan:
-            raise HTTPException(status_code=400, detail="Attendance already marked for this class")
-            
-        # Create new temporary attendance record
-        new_scan = TemporaryAttendance(
-            student_id=student_id,
-            subject=qr_data["subject"],
-            date=qr_data["date"],
-            scan_timestamp=datetime.now().isoformat(),
-            class_type=qr_data["type"]  # Add class type
-        )
-        db.add(new_scan)
-
-        # Get student details
-        student = db.query(Student).filter(Student.studentId == student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student not found")
+        try:
+            parse_date(qr_data["date"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-        db.commit()
+        # Duplicate check, student lookup and batched insert via the session buffer
+        name, registration_number = await qr_scan_buffer.record_scan(db, qr_data, int(student_id))
         
         # Broadcast the scan via WebSocket
-        await manager.broadcast({
+        await broadcast({
             "type": "qr_scan",
             "data": {
                 "studentId": student_id,
                 "subject": qr_data["subject"],
                 "date": qr_data["date"],
-                "name": student.name,
-                "registration_number": student.registration_number,
+                "name": name,
+                "registration_number": registration_number,
                 "class_type": qr_data["type"]  # Add class type
             }
-        })
+        }, topic=qr_session_topic(qr_data["subject"], qr_data["date"], qr_data["type"]))
 
         return {
             "message": "Attendance recorded successfully",
             "newScans": [{
                 "studentId": student_id,
-                "name": student.name,
-                "registration_number": student.registration_number
+                "name": name,
+                "registration_number": registration_number
             }]
         }
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        db.rollback()
-        print("Error processing QR scan:", str(e))
+        await db.rollback()
+        qr_log.exception("Error processing QR scan")
         raise HTTPException(status_code=500, detail="Failed to process QR scan")
 
+def finalize_attendance_rows(
+    db: Session,
+    subject: str,
+    date: str,
+    class_type: str,
+    attendance_data: list,
+    scanned_students=()
+):
+    """Write the final attendance for one class with a fixed number of queries.
+
+    Students who scanned the QR code are marked present regardless of the
+    submitted status; ``scanned_students`` are the ids drained from the QR
+    session buffer, combined here with any scans already persisted. The caller
+    commits.
+    """
+    # Create a set of student IDs who scanned QR codes
+    scanned_students = set(scanned_students) | {
+        student_id for (student_id,) in db.query(TemporaryAttendance.student_id).filter(
+            TemporaryAttendance.subject == subject,
+            TemporaryAttendance.date == parse_date(date),
+            TemporaryAttendance.class_type == class_type
+        ).all()
+    }
+
+    # If student scanned QR code, they should be marked present regardless of checkbox
+    statuses = {}
+    for record in attendance_data:
+        student_id = record.get("studentId")
+        statuses[student_id] = "P" if student_id in scanned_students else record.get("status", "A")
+
+    write_attendance_statuses(db, subject, date, class_type, statuses)
+
+    # Clear temporary attendance records
+    db.query(TemporaryAttendance).filter(
+        TemporaryAttendance.subject == subject,
+        TemporaryAttendance.date == parse_date(date),
+        TemporaryAttendance.class_type == class_type
+    ).delete(synchronize_session=False)
+    return len(statuses)
+
 # Add endpoint to finalize attendance
 @app.post("/attendance/finalize")
-async def finalize_attendance(request: Request, db: Session = Depends(get_db)):
+async def finalize_attendance(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         # Get request data
         data = await request.json()
@@ -2339,53 +4038,26 @@ async def finalize_attendance(request: Request, db: Session = Depends(get_db)):
         if not subject or not date or not class_type:
             raise HTTPException(status_code=400, detail="Subject, date, and class type are required")
 
-        # Get temporary attendance records
-        temp_records = db.query(TemporaryAttendance).filter(
-            TemporaryAttendance.subject == subject,
-            TemporaryAttendance.date == date
-        ).all()
-        
-        # Create a set of student IDs who scanned QR codes
-        scanned_students = {temp.student_id for temp in temp_records}
-
-        # Process all students from the form submission
-        for record in attendance_data:
-            student_id = record.get("studentId")
-            # If student scanned QR code, they should be marked present regardless of checkbox
-            status = "P" if student_id in scanned_students else record.get("status", "A")
-
-            # Check if attendance record exists
-            existing_record = db.query(Attendance).filter(
-                Attendance.studentId == student_id,
-                Attendance.subject_code == subject,
-                Attendance.date == date
-            ).first()
-
-            if existing_record:
-                existing_record.attendance = status
-                existing_record.class_type = class_type  # Update class type
-            else:
-                new_attendance = Attendance(
-                    studentId=student_id,
-                    subject_code=subject,
-                    date=date,
-                    attendance=status,
-                    class_type=class_type  # Add class type
-                )
-                db.add(new_attendance)
-
-        # Clear temporary attendance records
-        db.query(TemporaryAttendance).filter(
-            TemporaryAttendance.subject == subject,
-            TemporaryAttendance.date == date
-        ).delete()
-
-        db.commit()
+        # Scans still buffered in memory are used directly, not flushed first;
+        # other workers only buffer in write-through mode, so theirs are persisted
+        qr_session = await qr_scan_buffer.drain(subject, date, class_type)
+        try:
+            await db.run_sync(
+                finalize_attendance_rows, subject, date, class_type, attendance_data,
+                qr_session.scanned if qr_session else ()
+            )
+            await db.commit()
+        except Exception:
+            # Keep the scans so the faculty member can retry
+            if qr_session:
+                qr_scan_buffer.restore(qr_session)
+            raise
+        await broadcast({"drop_session": [subject, date, class_type]}, QR_BUFFER_TOPIC)
         return {"message": "Attendance finalized successfully"}
 
     except Exception as e:
-        db.rollback()
-        print("Error finalizing attendance:", str(e))
+        await db.rollback()
+        qr_log.exception("Error finalizing attendance")
         raise HTTPException(status_code=500, detail=str(e))
 
 class ReportData(BaseModel):
@@ -2393,192 +4065,202 @@ class ReportData(BaseModel):
     attendance: dict
     assignments: dict
 
-@app.get("/reports/students")
-async def get_student_reports(
-    branch: str = Query(...),
-    semester: int = Query(...),
-    type: str = Query(...),
-    db: Session = Depends(get_db)
-):
-    try:
-        if type == 'academic':
-            # Get academic performance data
-            students = db.query(Student).filter(
-                Student.branch == branch,
-                Student.semester == semester
-            ).all()
-            
-            total_students = len(students)
-            
-            # Get assignment data for pass rate calculation
-            assignments = db.query(Assignment).filter(
-                Assignment.branch == branch,
-                Assignment.semester == semester
-            ).all()
-            
-            # Calculate pass rate (students who submitted assignments / total assignments)
-            submissions = db.query(Submission).join(Assignment).filter(
-                Assignment.branch == branch,
-                Assignment.semester == semester
-            ).all()
-            
-            pass_rate = (len(submissions) / (total_students * len(assignments))) * 100 if assignments else 0
-            
-            # Get subject-wise performance
-            subjects = []
-            for assignment in assignments:
-                subject_submissions = [s for s in submissions if s.assignment_id == assignment.id]
-                if subject_submissions:
-                    subjects.append({
-                        "name": assignment.subject,
-                        "average": sum([1 for s in subject_submissions if s.status == 'approved']) / len(subject_submissions) * 100,
-                        "passRate": len([s for s in subject_submissions if s.status == 'approved']) / len(subject_submissions) * 100
-                    })
-            
-            return {
-                "academic": {
-                    "totalStudents": total_students,
-                    "passRate": round(pass_rate, 1),
-                    "averageGrade": "B+",  # This should be calculated based on actual grades
-                    "topPerformers": int(total_students * 0.15),  # Top 15% as an example
-                    "subjects": subjects
-                }
+def build_student_report(db: Session, branch: str, semester: int, type: str):
+    """Report payload for /reports/students; runs on the async session via run_sync"""
+    if type == 'academic':
+        # Get academic performance data
+        students = db.query(Student).filter(
+            Student.branch == branch,
+            Student.semester == semester
+        ).all()
+        
+        total_students = len(students)
+        
+        # Get assignment data for pass rate calculation
+        assignments = db.query(Assignment).filter(
+            Assignment.branch == branch,
+            Assignment.semester == semester
+        ).all()
+        
+        # Calculate pass rate (students who submitted assignments / total assignments)
+        submissions = db.query(Submission).join(Assignment).filter(
+            Assignment.branch == branch,
+            Assignment.semester == semester
+        ).all()
+        
+        pass_rate = (len(submissions) / (total_students * len(assignments))) * 100 if assignments else 0
+        
+        # Get subject-wise performance
+        subjects = []
+        for assignment in assignments:
+            subject_submissions = [s for s in submissions if s.assignment_id == assignment.id]
+            if subject_submissions:
+                subjects.append({
+                    "name": assignment.subject,
+                    "average": sum([1 for s in subject_submissions if s.status == 'approved']) / len(subject_submissions) * 100,
+                    "passRate": len([s for s in subject_submissions if s.status == 'approved']) / len(subject_submissions) * 100
+                })
+        
+        return {
+            "academic": {
+                "totalStudents": total_students,
+                "passRate": round(pass_rate, 1),
+                "averageGrade": "B+",  # This should be calculated based on actual grades
+                "topPerformers": int(total_students * 0.15),  # Top 15% as an example
+                "subjects": subjects
             }
-            
-        elif type == 'attendance':
-            # Get attendance data
-            attendance_records = db.query(Attendance).join(Student).filter(
-                Student.branch == branch,
-                Student.semester == semester
-            ).all()
-            
-            if not attendance_records:
-                return {
-                    "attendance": {
-                        "overallAttendance": 0,
-                        "highAttendance": 0,
-                        "mediumAttendance": 0,
-                        "lowAttendance": 0,
-                        "monthlyTrend": []
-                    }
-                }
-            
-            # Calculate attendance statistics
-            total_students = db.query(Student).filter(
-                Student.branch == branch,
-                Student.semester == semester
-            ).count()
-            
-            present_count = len([a for a in attendance_records if a.attendance == 'P'])
-            overall_attendance = (present_count / len(attendance_records)) * 100 if attendance_records else 0
-            
-            # Count students in each attendance category
-            student_attendance = {}
-            for record in attendance_records:
-                if record.studentId not in student_attendance:
-                    student_attendance[record.studentId] = []
-                student_attendance[record.studentId].append(record.attendance == 'P')
-            
-            high_attendance = 0
-            medium_attendance = 0
-            low_attendance = 0
-            
-            for student_records in student_attendance.values():
-                attendance_rate = sum(student_records) / len(student_records) * 100
-                if attendance_rate >= 85:
-                    high_attendance += 1
-                elif attendance_rate >= 75:
-                    medium_attendance += 1
-                else:
-                    low_attendance += 1
-            
-            # Calculate monthly trend
-            monthly_trend = []
-            current_date = datetime.now()
-            for i in range(4):  # Last 4 months
-                month_date = current_date - timedelta(days=30 * i)
-                month_records = [a for a in attendance_records if datetime.strptime(a.date, '%Y-%m-%d').month == month_date.month]
-                if month_records:
-                    present_count = len([a for a in month_records if a.attendance == 'P'])
-                    percentage = (present_count / len(month_records)) * 100
-                    monthly_trend.append({
-                        "month": month_date.strftime('%b'),
-                        "percentage": round(percentage, 1)
-                    })
-            
+        }
+        
+    elif type == 'attendance':
+        # Per-student totals from the attendance rollup
+        student_totals = db.query(
+            AttendanceSummary.studentId,
+            func.sum(AttendanceSummary.present_count),
+            func.sum(AttendanceSummary.total_count)
+        ).join(Student, Student.studentId == AttendanceSummary.studentId).filter(
+            Student.branch == branch,
+            Student.semester == semester
+        ).group_by(AttendanceSummary.studentId)\
+            .having(func.sum(AttendanceSummary.total_count) > 0)\
+            .all()
+        
+        if not student_totals:
             return {
                 "attendance": {
-                    "overallAttendance": round(overall_attendance, 1),
-                    "highAttendance": high_attendance,
-                    "mediumAttendance": medium_attendance,
-                    "lowAttendance": low_attendance,
-                    "monthlyTrend": monthly_trend[::-1]  # Reverse to show oldest to newest
+                    "overallAttendance": 0,
+                    "highAttendance": 0,
+                    "mediumAttendance": 0,
+                    "lowAttendance": 0,
+                    "monthlyTrend": []
                 }
             }
-            
-        elif type == 'assignments':
-            # Get assignment data
-            assignments = db.query(Assignment).filter(
-                Assignment.branch == branch,
-                Assignment.semester == semester
-            ).all()
-            
-            if not assignments:
-                return {
-                    "assignments": {
-                        "totalAssignments": 0,
-                        "submitted": 0,
-                        "pending": 0,
-                        "overdue": 0,
-                        "subjects": []
-                    }
-                }
-            
-            total_students = db.query(Student).filter(
-                Student.branch == branch,
-                Student.semester == semester
-            ).count()
-            
-            total_possible_submissions = total_students * len(assignments)
-            
-            # Get all submissions
-            submissions = db.query(Submission).join(Assignment).filter(
-                Assignment.branch == branch,
-                Assignment.semester == semester
-            ).all()
-            
-            # Calculate overall statistics
-            submitted = len(submissions)
-            pending = total_possible_submissions - submitted
-            overdue = len([s for s in submissions if s.status == 'overdue'])
-            
-            # Calculate subject-wise statistics
-            subjects = []
-            for assignment in assignments:
-                subject_submissions = [s for s in submissions if s.assignment_id == assignment.id]
-                total_subject_possible = total_students
-                
-                subjects.append({
-                    "name": assignment.subject,
-                    "submitted": round(len(subject_submissions) / total_subject_possible * 100, 1),
-                    "pending": round((total_subject_possible - len(subject_submissions)) / total_subject_possible * 100, 1),
-                    "overdue": round(len([s for s in subject_submissions if s.status == 'overdue']) / total_subject_possible * 100, 1)
+        
+        # Calculate attendance statistics
+        present_count = sum(int(present) for _, present, _ in student_totals)
+        total_count = sum(int(total) for _, _, total in student_totals)
+        overall_attendance = (present_count / total_count) * 100 if total_count else 0
+        
+        # Count students in each attendance category
+        high_attendance = 0
+        medium_attendance = 0
+        low_attendance = 0
+        
+        for _, present, total in student_totals:
+            attendance_rate = int(present) / int(total) * 100
+            if attendance_rate >= 85:
+                high_attendance += 1
+            elif attendance_rate >= 75:
+                medium_attendance += 1
+            else:
+                low_attendance += 1
+        
+        # Present/total per calendar month (dates are stored as YYYY-MM-DD)
+        month = func.substr(Attendance.date, 6, 2)
+        monthly_counts = db.query(
+            month,
+            func.sum(case((Attendance.attendance == 'P', 1), else_=0)),
+            func.count(Attendance.attendance_id)
+        ).join(Student, Student.studentId == Attendance.studentId).filter(
+            Student.branch == branch,
+            Student.semester == semester
+        ).group_by(month).all()
+        monthly_counts = {int(m): (int(p or 0), int(t)) for m, p, t in monthly_counts if m}
+        
+        # Calculate monthly trend
+        monthly_trend = []
+        current_date = datetime.now()
+        for i in range(4):  # Last 4 months
+            month_date = current_date - timedelta(days=30 * i)
+            month_present, month_total = monthly_counts.get(month_date.month, (0, 0))
+            if month_total:
+                percentage = (month_present / month_total) * 100
+                monthly_trend.append({
+                    "month": month_date.strftime('%b'),
+                    "percentage": round(percentage, 1)
                 })
-            
+        
+        return {
+            "attendance": {
+                "overallAttendance": round(overall_attendance, 1),
+                "highAttendance": high_attendance,
+                "mediumAttendance": medium_attendance,
+                "lowAttendance": low_attendance,
+                "monthlyTrend": monthly_trend[::-1]  # Reverse to show oldest to newest
+            }
+        }
+        
+    elif type == 'assignments':
+        # Get assignment data
+        assignments = db.query(Assignment).filter(
+            Assignment.branch == branch,
+            Assignment.semester == semester
+        ).all()
+        
+        if not assignments:
             return {
                 "assignments": {
-                    "totalAssignments": len(assignments),
-                    "submitted": submitted,
-                    "pending": pending,
-                    "overdue": overdue,
-                    "subjects": subjects
+                    "totalAssignments": 0,
+                    "submitted": 0,
+                    "pending": 0,
+                    "overdue": 0,
+                    "subjects": []
                 }
             }
         
-        return {"error": "Invalid report type"}
+        total_students = db.query(Student).filter(
+            Student.branch == branch,
+            Student.semester == semester
+        ).count()
+        
+        total_possible_submissions = total_students * len(assignments)
+        
+        # Get all submissions
+        submissions = db.query(Submission).join(Assignment).filter(
+            Assignment.branch == branch,
+            Assignment.semester == semester
+        ).all()
         
+        # Calculate overall statistics
+        submitted = len(submissions)
+        pending = total_possible_submissions - submitted
+        overdue = len([s for s in submissions if s.status == 'overdue'])
+        
+        # Calculate subject-wise statistics
+        subjects = []
+        for assignment in assignments:
+            subject_submissions = [s for s in submissions if s.assignment_id == assignment.id]
+            total_subject_possible = total_students
+            
+            subjects.append({
+                "name": assignment.subject,
+                "submitted": round(len(subject_submissions) / total_subject_possible * 100, 1),
+                "pending": round((total_subject_possible - len(subject_submissions)) / total_subject_possible * 100, 1),
+                "overdue": round(len([s for s in subject_submissions if s.status == 'overdue']) / total_subject_possible * 100, 1)
+            })
+        
+        return {
+            "assignments": {
+                "totalAssignments": len(assignments),
+                "submitted": submitted,
+                "pending": pending,
+                "overdue": overdue,
+                "subjects": subjects
+            }
+        }
+    
+    return {"error": "Invalid report type"}
+
+@app.get("/reports/students")
+async def get_student_reports(
+    branch: str = Query(...),
+    semester: int = Query(...),
+    type: str = Query(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await db.run_sync(build_student_report, branch, semester, type)
     except Exception as e:
-        print(f"Error generating report: {str(e)}")
+        reports_log.exception("Error generating report")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/reports/generate")
@@ -2586,7 +4268,7 @@ async def generate_report(
     branch: str = Query(...),
     semester: int = Query(...),
     type: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         # Reuse the logic from get_student_reports
@@ -2601,9 +4283,13 @@ async def download_report(
     semester: int = Query(...),
     type: str = Query(...),
     format: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
+        # pandas is only needed here, so keep it off the import path
+        import io
+        import pandas as pd
+
         # Get report data
         report_data = await get_student_reports(branch, semester, type, db)
         
@@ -2655,3 +4341,58 @@ async def download_report(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "false").lower() in ("1", "true", "yes", "on")
+
+def init_db(db: Session):
+    """Create missing tables and indexes and backfill the attendance rollup.
+
+    Safe to re-run. Meant for deploys (`python main.py migrate`); set
+    DB_INIT_ON_STARTUP=1 to run it when the app starts instead.
+    """
+    bind = db.get_bind()
+    inspector = inspect(bind)
+    missing = [table.name for table in Base.metadata.sorted_tables if not inspector.has_table(table.name)]
+    Base.metadata.create_all(bind=bind)
+    removed = migrate_attendance_unique_index(db)
+    # create_all skips indexes added to tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    # A new rollup table starts empty (deduplicating already rebuilt it)
+    if AttendanceSummary.__tablename__ in missing and not removed:
+        rebuild_attendance_rollup(db)
+    rebuild_search_index(db)
+    return len(missing)
+
+@app.on_event("startup")
+def init_db_on_startup():
+    if not DB_INIT_ON_STARTUP:
+        return
+    db = SessionLocal()
+    try:
+        init_db(db)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Maintenance commands, e.g. `python main.py rebuild-attendance-rollup`
+    import sys
+
+    commands = {
+        "migrate": (init_db, "Database is up to date ({} tables created)"),
+        "rebuild-attendance-rollup": (rebuild_attendance_rollup, "Rebuilt attendance rollup: {} rows"),
+        "migrate-attendance-index": (migrate_attendance_unique_index, "Removed {} duplicate attendance rows"),
+        "rebuild-search-index": (rebuild_search_index, "Indexed {} documents for search"),
+    }
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command not in commands:
+        print(f"Usage: python main.py [{'|'.join(commands)}]")
+        sys.exit(1)
+
+    handler, message = commands[command]
+    db = SessionLocal()
+    try:
+        print(message.format(handler(db)))
+    finally:
+        db.close()